@@ -0,0 +1,21 @@
+"""Create the base tables
+
+Revision ID: 0000_initial_schema
+Revises:
+Create Date: 2026-10-15
+"""
+from alembic import op
+from app.utils.database import Base
+from app.models import user, instance, template  # noqa: F401 - register tables
+
+revision = "0000_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # checkfirst: databases bootstrapped by the old startup create_all already have these
+    Base.metadata.create_all(bind=op.get_bind(), checkfirst=True)
+
+def downgrade():
+    Base.metadata.drop_all(bind=op.get_bind())
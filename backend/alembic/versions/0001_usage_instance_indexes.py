@@ -0,0 +1,29 @@
+"""Add composite indexes for billing and instance queries
+
+Revision ID: 0001_usage_instance_indexes
+Revises: 0000_initial_schema
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+revision = "0001_usage_instance_indexes"
+down_revision = "0000_initial_schema"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_usage_user_created", "usage_records", "user_id, created_at"),
+    ("ix_instance_user_status", "instances", "user_id, status"),
+    ("ix_instance_last_activity", "instances", "last_activity"),
+]
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
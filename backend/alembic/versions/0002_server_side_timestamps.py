@@ -0,0 +1,31 @@
+"""Generate timestamp defaults in the database
+
+Revision ID: 0002_server_side_timestamps
+Revises: 0001_usage_instance_indexes
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_server_side_timestamps"
+down_revision = "0001_usage_instance_indexes"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("users", "created_at"),
+    ("users", "updated_at"),
+    ("instances", "created_at"),
+    ("instances", "last_activity"),
+    ("usage_records", "created_at"),
+    ("templates", "created_at"),
+    ("templates", "updated_at"),
+]
+
+def upgrade():
+    for table, column in COLUMNS:
+        op.alter_column(table, column, server_default=sa.text("timezone('utc', now())"))
+
+def downgrade():
+    for table, column in COLUMNS:
+        op.alter_column(table, column, server_default=None)
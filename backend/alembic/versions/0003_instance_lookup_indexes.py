@@ -0,0 +1,30 @@
+"""Index owner lookups and open usage records
+
+Revision ID: 0003_instance_lookup_indexes
+Revises: 0002_server_side_timestamps
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+revision = "0003_instance_lookup_indexes"
+down_revision = "0002_server_side_timestamps"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_instance_user_id_id", "instances", "user_id, id", None),
+    # Only open records are ever looked up by instance; keep the btree tiny
+    ("ix_usage_open", "usage_records", "instance_id", "end_time IS NULL"),
+]
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            predicate = f" WHERE {where}" if where else ""
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns}){predicate}")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
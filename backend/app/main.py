@@ -1,112 +1,58 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from brotli_asgi import BrotliMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 import uvicorn
 from .utils.config import settings
-from .utils.database import engine, Base
-from .routers import auth, instances, templates, billing
-from .services.azure_manager import AzureGPUManager
-from .services.autopause import AutoPauseEngine
+from .utils.fastpath import FastPathMiddleware
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO if settings.DEBUG else logging.WARNING,
+    level=settings.LOG_LEVEL.upper() or (logging.INFO if settings.DEBUG else logging.WARNING),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-# Global services
-azure_manager = None
-autopause_engine = None
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage application lifecycle"""
-    global azure_manager, autopause_engine
-    
-    # Startup
-    logger.info("Starting GPU Cloud Platform...")
-    
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Initialize services
-    azure_manager = AzureGPUManager()
-    autopause_engine = AutoPauseEngine(azure_manager)
-    
-    # Start AutoPause engine
-    await autopause_engine.start()
-    
-    logger.info("GPU Cloud Platform started successfully!")
-    
-    yield
-    
-    # Shutdown
-    logger.info("Shutting down GPU Cloud Platform...")
-    await autopause_engine.stop()
-    logger.info("Shutdown complete")
+# MODE=simple serves the Modal/Redis API only; full mode adds DB, auth and Azure
+if settings.MODE == "simple":
+    from .routers import simple as mode
+else:
+    from .routers import platform as mode
 
 # Create FastAPI app
 app = FastAPI(
     title="GPU Cloud Platform",
     description="Deploy GPUs in 10 seconds, save 70% with AutoPause",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=mode.lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=["*"] if settings.MODE == "simple" else settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Brotli for clients that accept it, gzip fallback for the rest
+app.add_middleware(BrotliMiddleware, quality=4, minimum_size=500)
+# Added last so probes to / and /health skip CORS and compression
+app.add_middleware(FastPathMiddleware, routes=mode.FAST_PATHS)
 
 # Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(instances.router, prefix="/api/instances", tags=["Instances"])
-app.include_router(templates.router, prefix="/api/templates", tags=["Templates"])
-app.include_router(billing.router, prefix="/api/billing", tags=["Billing"])
-
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "name": "GPU Cloud Platform",
-        "version": "1.0.0",
-        "status": "operational",
-        "message": "Deploy GPUs in 10 seconds, save 70% with AutoPause"
-    }
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "services": {
-            "database": "connected",
-            "azure": "connected" if azure_manager else "disconnected",
-            "autopause": "running" if autopause_engine and autopause_engine.is_running else "stopped"
-        }
-    }
-
-@app.get("/api/stats")
-async def platform_stats():
-    """Get platform statistics"""
-    if not autopause_engine:
-        raise HTTPException(status_code=503, detail="AutoPause engine not initialized")
-    
-    analytics = autopause_engine.get_analytics()
-    
-    return {
-        "total_instances": analytics["total_instances_monitored"],
-        "currently_paused": analytics["currently_paused"],
-        "total_savings": f"${analytics['total_savings_all_time']:.2f}",
-        "total_pause_hours": f"{analytics['total_pause_hours']:.1f}",
-        "pause_efficiency": f"{analytics['pause_efficiency']:.1f}%"
-    }
+if settings.MODE == "simple":
+    app.include_router(mode.router)
+else:
+    from .routers import auth, instances, templates, billing
+    
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    app.include_router(instances.router, prefix="/api/instances", tags=["Instances"])
+    app.include_router(templates.router, prefix="/api/templates", tags=["Templates"])
+    app.include_router(billing.router, prefix="/api/billing", tags=["Billing"])
+    app.include_router(mode.router)
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, String, Float, DateTime, Boolean, Integer, ForeignKey, JSON
+from sqlalchemy import Column, String, Float, DateTime, Boolean, Integer, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from ..utils.database import Base
+from ..utils.database import Base, utc_now
 
 class Instance(Base):
     __tablename__ = "instances"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_instance_user_status", "user_id", "status"),
+        Index("ix_instance_last_activity", "last_activity"),
+        Index("ix_instance_user_id_id", "user_id", "id"),
+    )
     
     id = Column(String, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -25,13 +30,13 @@ class Instance(Base):
     
     is_spot_instance = Column(Boolean, default=True)
     auto_pause_enabled = Column(Boolean, default=True)
-    last_activity = Column(DateTime, default=datetime.utcnow)
+    last_activity = Column(DateTime, server_default=utc_now())
     gpu_utilization = Column(Float, default=0.0)
     
     template_id = Column(String, ForeignKey("templates.id"), nullable=True)
     environment_vars = Column(JSON, nullable=True)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
     started_at = Column(DateTime, nullable=True)
     paused_at = Column(DateTime, nullable=True)
     stopped_at = Column(DateTime, nullable=True)
@@ -43,6 +48,11 @@ class Instance(Base):
     
 class UsageRecord(Base):
     __tablename__ = "usage_records"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_usage_user_created", "user_id", "created_at"),
+        Index("ix_usage_open", "instance_id", postgresql_where=text("end_time IS NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -56,7 +66,7 @@ class UsageRecord(Base):
     was_paused = Column(Boolean, default=False)
     gpu_utilization_avg = Column(Float, default=0.0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
     
     # Relationships
     user = relationship("User", back_populates="usage_records")
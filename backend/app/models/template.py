@@ -1,10 +1,10 @@
 from sqlalchemy import Column, String, Float, DateTime, Boolean, Integer, JSON
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from ..utils.database import Base
+from ..utils.database import Base, utc_now
 
 class Template(Base):
     __tablename__ = "templates"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -26,8 +26,8 @@ class Template(Base):
     huggingface_model_id = Column(String, nullable=True)
     estimated_cost_per_hour = Column(Float, nullable=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     instances = relationship("Instance", back_populates="template")
\ No newline at end of file
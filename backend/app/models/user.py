@@ -1,10 +1,10 @@
 from sqlalchemy import Column, String, Float, DateTime, Boolean, Integer
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from ..utils.database import Base
+from ..utils.database import Base, utc_now
 
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -18,8 +18,8 @@ class User(Base):
     stripe_customer_id = Column(String, nullable=True)
     subscription_tier = Column(String, default="free")  # free, starter, business, enterprise
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     instances = relationship("Instance", back_populates="user")
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Any
 from ..utils.database import get_db
 from ..utils.auth import (
-    verify_password,
-    get_password_hash,
+    averify_password,
+    aget_password_hash,
     create_access_token,
     get_current_active_user
 )
@@ -21,16 +22,16 @@ from ..schemas.user import (
 
 router = APIRouter()
 
-@router.post("/register", response_model=UserResponse)
+@router.post("/register", response_model=UserResponse, response_model_exclude_unset=True)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Register a new user with $50 free credits"""
     
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    existing_user_id = await db.scalar(select(User.id).where(User.email == user_data.email))
+    if existing_user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -40,28 +41,28 @@ async def register(
     db_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await aget_password_hash(user_data.password),
         credits_remaining=settings.NEW_USER_CREDITS,
         subscription_tier="free"
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Login with email and password"""
     
     # Find user
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -86,7 +87,7 @@ async def login(
         "token_type": "bearer"
     }
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, response_model_exclude_unset=True)
 async def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -104,7 +105,7 @@ async def logout(
 @router.post("/verify-email/{token}")
 async def verify_email(
     token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Verify user email"""
     # Implement email verification logic
@@ -113,11 +114,11 @@ async def verify_email(
 @router.post("/forgot-password")
 async def forgot_password(
     email: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Send password reset email"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    user_id = await db.scalar(select(User.id).where(User.email == email))
+    if not user_id:
         # Don't reveal if email exists
         return {"message": "If the email exists, a reset link has been sent"}
     
@@ -128,7 +129,7 @@ async def forgot_password(
 async def reset_password(
     token: str,
     new_password: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Reset password with token"""
     # Implement password reset logic
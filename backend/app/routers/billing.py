@@ -1,21 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Any
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from cachetools import TTLCache
+import asyncio
+import functools
 import stripe
+from ..utils.cache import read_through
 from ..utils.database import get_db
 from ..utils.auth import get_current_active_user
 from ..utils.config import settings
 from ..models.user import User
 from ..models.instance import UsageRecord
-from ..main import autopause_engine
+from ..utils.services import get_autopause_engine
+from ..services.autopause import AutoPauseEngine
 
 router = APIRouter()
 
 # Initialize Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Webhook settings resolved once
+_webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+HANDLED_WEBHOOK_EVENTS = frozenset({"payment_intent.succeeded", "invoice.payment_succeeded"})
+
 # Pricing tiers
 PRICING_TIERS = {
     "starter": {
@@ -56,35 +65,68 @@ PRICING_TIERS = {
     }
 }
 
+# Recent invoices per Stripe customer; invoices don't change second-to-second
+invoice_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_invoice_fetches: Dict[str, asyncio.Future] = {}
+
+async def _get_invoices(customer_id: str) -> List[Dict[str, Any]]:
+    """Fetch invoices for a customer, collapsing concurrent misses into one Stripe call"""
+    return await read_through(
+        invoice_cache, _invoice_fetches, customer_id,
+        functools.partial(_fetch_invoices, customer_id)
+    )
+
+async def _fetch_invoices(customer_id: str) -> List[Dict[str, Any]]:
+    invoices = await asyncio.to_thread(
+        stripe.Invoice.list,
+        customer=customer_id,
+        limit=10
+    )
+    return [
+        {
+            "id": inv.id,
+            "date": datetime.fromtimestamp(inv.created).isoformat(),
+            "amount": inv.amount_paid / 100,
+            "status": inv.status,
+            "pdf_url": inv.invoice_pdf
+        }
+        for inv in invoices.data
+    ]
+
 @router.get("/usage")
 async def get_usage(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
 ) -> Any:
-    """Get current usage and billing information"""
+    """Get current usage and billing information (amounts are numeric USD)"""
     
     # Get current month usage
     start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    usage_records = db.query(UsageRecord).filter(
-        UsageRecord.user_id == current_user.id,
-        UsageRecord.created_at >= start_of_month
-    ).all()
-    
-    total_cost = sum(record.cost for record in usage_records)
-    total_hours = sum(record.duration_seconds / 3600 for record in usage_records)
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(UsageRecord.cost), 0.0),
+            func.coalesce(func.sum(UsageRecord.duration_seconds), 0)
+        ).where(
+            UsageRecord.user_id == current_user.id,
+            UsageRecord.created_at >= start_of_month
+        )
+    )
+    total_cost, total_seconds = result.one()
+    total_hours = total_seconds / 3600
     
     # Get AutoPause savings
     total_savings = autopause_engine.get_user_total_savings(current_user.id)
     
     return {
         "current_month": {
-            "total_cost": f"${total_cost:.2f}",
-            "total_hours": f"{total_hours:.1f}",
-            "total_savings": f"${total_savings:.2f}",
+            "total_cost": round(total_cost, 2),
+            "total_hours": round(total_hours, 1),
+            "total_savings": round(total_savings, 2),
             "savings_percentage": (total_savings / max(total_cost, 0.01)) * 100 if total_cost > 0 else 0
         },
-        "credits_remaining": f"${current_user.credits_remaining:.2f}",
+        "credits_remaining": round(current_user.credits_remaining, 2),
         "subscription_tier": current_user.subscription_tier,
         "next_billing_date": (datetime.utcnow() + timedelta(days=30)).isoformat()
     }
@@ -94,7 +136,7 @@ async def get_detailed_usage(
     start_date: datetime = None,
     end_date: datetime = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Get detailed usage records"""
     
@@ -103,25 +145,28 @@ async def get_detailed_usage(
     if not end_date:
         end_date = datetime.utcnow()
     
-    usage_records = db.query(UsageRecord).filter(
-        UsageRecord.user_id == current_user.id,
-        UsageRecord.created_at >= start_date,
-        UsageRecord.created_at <= end_date
-    ).all()
+    # Aggregate per day in the database
+    day = func.date_trunc("day", UsageRecord.created_at).label("day")
+    result = await db.execute(
+        select(
+            day,
+            func.coalesce(func.sum(UsageRecord.cost), 0.0),
+            func.coalesce(func.sum(UsageRecord.duration_seconds), 0),
+            func.count()
+        ).where(
+            UsageRecord.user_id == current_user.id,
+            UsageRecord.created_at.between(start_date, end_date)
+        ).group_by(day).order_by(day)
+    )
     
-    # Group by day
-    daily_usage = {}
-    for record in usage_records:
-        day = record.created_at.date().isoformat()
-        if day not in daily_usage:
-            daily_usage[day] = {
-                "cost": 0,
-                "hours": 0,
-                "instances": 0
-            }
-        daily_usage[day]["cost"] += record.cost
-        daily_usage[day]["hours"] += record.duration_seconds / 3600
-        daily_usage[day]["instances"] += 1
+    daily_usage = {
+        usage_day.date().isoformat(): {
+            "cost": cost,
+            "hours": seconds / 3600,
+            "instances": count
+        }
+        for usage_day, cost, seconds, count in result
+    }
     
     return {
         "period": {
@@ -137,7 +182,7 @@ async def get_detailed_usage(
 async def add_credits(
     amount: float,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Add credits to user account"""
     
@@ -149,7 +194,8 @@ async def add_credits(
     
     try:
         # Create Stripe payment intent
-        intent = stripe.PaymentIntent.create(
+        intent = await asyncio.to_thread(
+            stripe.PaymentIntent.create,
             amount=int(amount * 100),  # Stripe uses cents
             currency="usd",
             customer=current_user.stripe_customer_id,
@@ -173,7 +219,7 @@ async def add_credits(
 async def subscribe_to_tier(
     tier: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Subscribe to a pricing tier"""
     
@@ -194,16 +240,20 @@ async def subscribe_to_tier(
     try:
         # Create or get Stripe customer
         if not current_user.stripe_customer_id:
-            customer = stripe.Customer.create(
+            # Idempotency key makes a retried subscribe reuse the same customer
+            customer = await asyncio.to_thread(
+                stripe.Customer.create,
                 email=current_user.email,
                 name=current_user.full_name,
-                metadata={"user_id": str(current_user.id)}
+                metadata={"user_id": str(current_user.id)},
+                idempotency_key=f"customer-{current_user.id}"
             )
             current_user.stripe_customer_id = customer.id
-            db.commit()
+            await db.commit()
         
         # Create subscription
-        subscription = stripe.Subscription.create(
+        subscription = await asyncio.to_thread(
+            stripe.Subscription.create,
             customer=current_user.stripe_customer_id,
             items=[{
                 "price": f"price_{tier}"  # You need to create these in Stripe
@@ -217,7 +267,8 @@ async def subscribe_to_tier(
         # Update user subscription
         current_user.subscription_tier = tier
         current_user.credits_remaining += tier_info["credits"]
-        db.commit()
+        await db.commit()
+        invoice_cache.pop(current_user.stripe_customer_id, None)
         
         return {
             "subscription_id": subscription.id,
@@ -235,7 +286,7 @@ async def subscribe_to_tier(
 @router.post("/cancel-subscription")
 async def cancel_subscription(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Cancel current subscription"""
     
@@ -249,38 +300,24 @@ async def cancel_subscription(
     # ...
     
     current_user.subscription_tier = "free"
-    db.commit()
+    await db.commit()
+    if current_user.stripe_customer_id:
+        invoice_cache.pop(current_user.stripe_customer_id, None)
     
     return {"message": "Subscription cancelled successfully"}
 
 @router.get("/invoices")
 async def get_invoices(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
-    """Get user invoices"""
+    """Get user invoices (amounts are numeric USD)"""
     
     if not current_user.stripe_customer_id:
         return {"invoices": []}
     
     try:
-        invoices = stripe.Invoice.list(
-            customer=current_user.stripe_customer_id,
-            limit=10
-        )
-        
-        return {
-            "invoices": [
-                {
-                    "id": inv.id,
-                    "date": datetime.fromtimestamp(inv.created).isoformat(),
-                    "amount": f"${inv.amount_paid / 100:.2f}",
-                    "status": inv.status,
-                    "pdf_url": inv.invoice_pdf
-                }
-                for inv in invoices.data
-            ]
-        }
+        return {"invoices": await _get_invoices(current_user.stripe_customer_id)}
     except stripe.error.StripeError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -290,7 +327,7 @@ async def get_invoices(
 @router.post("/webhook")
 async def stripe_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Handle Stripe webhooks"""
     
@@ -298,25 +335,30 @@ async def stripe_webhook(
     sig_header = request.headers.get("Stripe-Signature")
     
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+        event = await asyncio.to_thread(
+            stripe.Webhook.construct_event,
+            payload, sig_header, _webhook_secret
         )
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid payload")
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
+    # Verified events we don't handle are acknowledged before any DB work
+    if event["type"] not in HANDLED_WEBHOOK_EVENTS:
+        return {"status": "ignored"}
+    
     # Handle the event
     if event["type"] == "payment_intent.succeeded":
         payment_intent = event["data"]["object"]
         user_id = payment_intent["metadata"]["user_id"]
         
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = await db.get(User, int(user_id))
         if user:
             # Add credits
             amount = payment_intent["amount"] / 100
             user.credits_remaining += amount
-            db.commit()
+            await db.commit()
     
     elif event["type"] == "invoice.payment_succeeded":
         # Handle subscription payment
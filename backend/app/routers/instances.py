@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
 from datetime import datetime
-from ..utils.database import get_db
+from ..utils.database import AsyncSessionLocal, get_db, utc_now
 from ..utils.auth import get_current_active_user
 from ..models.user import User
 from ..models.instance import Instance, UsageRecord
@@ -10,28 +11,64 @@ from ..schemas.instance import (
     InstanceCreate,
     InstanceResponse,
     InstanceMetrics,
-    InstanceAction
+    InstanceAction,
+    InstanceBulkAction
 )
-from ..main import azure_manager, autopause_engine
+from ..utils.services import get_azure_manager, get_autopause_engine
+from ..services.azure_manager import AzureGPUManager
+from ..services.autopause import AutoPauseEngine
+import asyncio
+import functools
 import uuid
 
 router = APIRouter()
 
+# Azure calls in flight per bulk request; keeps us under ARM write throttling
+BULK_ACTION_CONCURRENCY = 16
+
+# Longest a provisioning result waits for the deploy request to commit its row
+ROW_COMMIT_TIMEOUT = 60
+
+# Exactly the columns InstanceResponse exposes, so listing skips the ORM entirely
+_INSTANCE_COLS = tuple(getattr(Instance, field) for field in InstanceResponse.model_fields)
+
+async def _record_provisioning_result(row_committed: asyncio.Event, instance_id: str, succeeded: bool):
+    """Flip a provisioning instance to running (or error) once Azure finishes the VM
+    
+    A fast ARM failure can finish before the deploy request commits the row,
+    so wait for that commit first.
+    """
+    try:
+        await asyncio.wait_for(row_committed.wait(), ROW_COMMIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Instance)
+            .where(Instance.id == instance_id, Instance.status == "provisioning")
+            .values(status="running" if succeeded else "error")
+        )
+        await db.commit()
+
 @router.get("/", response_model=List[InstanceResponse])
 async def list_instances(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """List all instances for current user"""
-    instances = db.query(Instance).filter(Instance.user_id == current_user.id).all()
-    return instances
+    result = await db.execute(
+        select(*_INSTANCE_COLS).where(Instance.user_id == current_user.id)
+    )
+    return [InstanceResponse(**row) for row in result.mappings()]
 
 @router.post("/deploy", response_model=InstanceResponse)
 async def deploy_instance(
     instance_data: InstanceCreate,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    azure_manager: AzureGPUManager = Depends(get_azure_manager),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
 ) -> Any:
     """Deploy a new GPU instance in <60 seconds"""
     
@@ -44,13 +81,15 @@ async def deploy_instance(
         )
     
     # Create instance in Azure
+    row_committed = asyncio.Event()
     try:
         azure_instance = await azure_manager.create_instance(
             gpu_type=instance_data.gpu_type,
             user_id=current_user.id,
             name=instance_data.name,
             use_spot=instance_data.use_spot,
-            docker_image=instance_data.docker_image
+            docker_image=instance_data.docker_image,
+            on_ready=functools.partial(_record_provisioning_result, row_committed)
         )
     except Exception as e:
         raise HTTPException(
@@ -59,12 +98,13 @@ async def deploy_instance(
         )
     
     # Save to database
+    started_at = datetime.utcnow()
     db_instance = Instance(
         id=azure_instance["id"],
         user_id=current_user.id,
         name=azure_instance["name"],
         gpu_type=instance_data.gpu_type,
-        status="running",
+        status=azure_instance["status"],
         azure_resource_id=azure_instance["azure_resource_id"],
         public_ip=azure_instance["public_ip"],
         ssh_port=azure_instance["ssh_port"],
@@ -75,25 +115,33 @@ async def deploy_instance(
         auto_pause_enabled=instance_data.auto_pause_enabled,
         template_id=instance_data.template_id,
         environment_vars=instance_data.environment_vars,
-        started_at=datetime.utcnow()
+        # Concrete value rather than utc_now(): the response needs it without
+        # reloading the row (server defaults come back via eager_defaults)
+        started_at=started_at
     )
     
-    db.add(db_instance)
-    db.commit()
-    db.refresh(db_instance)
-    
-    # Register with AutoPause
-    if instance_data.auto_pause_enabled:
-        await autopause_engine.register_instance(db_instance.id, current_user.id)
-    
-    # Start usage tracking
+    # Instance and its first usage record land in one transaction
     usage_record = UsageRecord(
         user_id=current_user.id,
         instance_id=db_instance.id,
-        start_time=datetime.utcnow()
+        start_time=started_at
     )
-    db.add(usage_record)
-    db.commit()
+    db.add_all([db_instance, usage_record])
+    try:
+        await db.commit()
+    finally:
+        # Lets the provisioning result through (a failed commit leaves nothing to update)
+        row_committed.set()
+    
+    # Register with AutoPause after the response is sent
+    if instance_data.auto_pause_enabled:
+        background_tasks.add_task(
+            autopause_engine.register_instance,
+            db_instance.id,
+            current_user.id,
+            instance_data.gpu_type,
+            estimated_cost
+        )
     
     return db_instance
 
@@ -101,15 +149,12 @@ async def deploy_instance(
 async def get_instance(
     instance_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Get instance details"""
-    instance = db.query(Instance).filter(
-        Instance.id == instance_id,
-        Instance.user_id == current_user.id
-    ).first()
+    instance = await db.get(Instance, instance_id)
     
-    if not instance:
+    if not instance or instance.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instance not found"
@@ -121,166 +166,238 @@ async def get_instance(
 async def get_instance_metrics(
     instance_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    azure_manager: AzureGPUManager = Depends(get_azure_manager)
 ) -> Any:
     """Get real-time metrics for an instance"""
-    instance = db.query(Instance).filter(
-        Instance.id == instance_id,
-        Instance.user_id == current_user.id
-    ).first()
+    instance = await db.get(Instance, instance_id)
     
-    if not instance:
+    if not instance or instance.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instance not found"
         )
     
-    # Get metrics from Azure
+    # Get metrics from Azure (the manager caches them per VM)
     metrics = await azure_manager.get_instance_metrics(instance.name)
     
     # Add GPU specs
     gpu_spec = azure_manager.GPU_SPECS[instance.gpu_type]
-    metrics.update({
-        "gpu_memory_total_gb": gpu_spec["gpu_memory_gb"],
-        "memory_total_gb": gpu_spec["memory_gb"]
-    })
     
-    return InstanceMetrics(**metrics)
+    return InstanceMetrics(
+        **metrics,
+        gpu_memory_total_gb=gpu_spec["gpu_memory_gb"],
+        memory_total_gb=gpu_spec["memory_gb"]
+    )
+
+async def _close_usage_records(db: AsyncSession, instance_id: str, cost_per_hour: float) -> float:
+    """End open usage records for an instance in one UPDATE and return what they cost"""
+    elapsed = func.extract("epoch", utc_now() - UsageRecord.start_time)
+    result = await db.execute(
+        update(UsageRecord)
+        .where(
+            UsageRecord.instance_id == instance_id,
+            UsageRecord.end_time.is_(None)
+        )
+        .values(
+            end_time=utc_now(),
+            duration_seconds=cast(elapsed, Integer),
+            cost=elapsed / 3600 * cost_per_hour
+        )
+        .returning(UsageRecord.cost)
+        .execution_options(synchronize_session=False)
+    )
+    return sum(result.scalars().all())
+
+async def _handle_stop(instance, db, current_user, azure_manager, autopause_engine) -> bool:
+    if not await azure_manager.stop_instance(instance.name):
+        return False
+    
+    instance.status = "stopped"
+    instance.stopped_at = utc_now()
+    
+    # End current usage record and update user credits
+    cost = await _close_usage_records(db, instance.id, instance.cost_per_hour)
+    current_user.credits_remaining -= cost
+    instance.total_cost += cost
+    
+    await db.commit()
+    return True
+
+async def _handle_resume(instance, db, current_user, azure_manager, autopause_engine) -> bool:
+    if instance.status == "paused":
+        # Resume from AutoPause
+        success = await autopause_engine.resume_instance(instance.id)
+    else:
+        # Start stopped instance
+        success = await azure_manager.start_instance(instance.name)
+    
+    if not success:
+        return False
+    
+    instance.status = "running"
+    instance.started_at = utc_now()
+    
+    # Start new usage record
+    db.add(UsageRecord(
+        user_id=current_user.id,
+        instance_id=instance.id,
+        start_time=utc_now()
+    ))
+    await db.commit()
+    return True
+
+async def _handle_pause(instance, db, current_user, azure_manager, autopause_engine) -> bool:
+    # Manual pause
+    if not await autopause_engine.force_pause(instance.id):
+        return False
+    
+    instance.status = "paused"
+    instance.paused_at = utc_now()
+    await db.commit()
+    return True
+
+async def _handle_delete(instance, db, current_user, azure_manager, autopause_engine) -> bool:
+    # Delete from Azure while dropping AutoPause monitoring
+    success, _ = await asyncio.gather(
+        azure_manager.delete_instance(
+            instance.name,
+            azure_manager.resource_ids_for(instance.id, instance.name)
+        ),
+        autopause_engine.unregister_instance(instance.id)
+    )
+    
+    if not success:
+        if instance.auto_pause_enabled:
+            # VM is still there, keep watching it
+            await autopause_engine.register_instance(
+                instance.id,
+                current_user.id,
+                instance.gpu_type,
+                instance.cost_per_hour
+            )
+        return False
+    
+    # End usage record
+    current_user.credits_remaining -= await _close_usage_records(
+        db, instance.id, instance.cost_per_hour
+    )
+    
+    # Delete from database
+    await db.delete(instance)
+    await db.commit()
+    return True
+
+# action -> (handler, success message)
+_ACTIONS = {
+    "stop": (_handle_stop, "Instance stopped successfully"),
+    "resume": (_handle_resume, "Instance resumed successfully"),
+    "pause": (_handle_pause, "Instance paused successfully"),
+    "delete": (_handle_delete, "Instance deleted successfully"),
+}
 
 @router.post("/{instance_id}/action")
 async def perform_instance_action(
     instance_id: str,
     action: InstanceAction,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    azure_manager: AzureGPUManager = Depends(get_azure_manager),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
 ) -> Any:
-    """Perform an action on an instance (stop, resume, delete)"""
-    instance = db.query(Instance).filter(
-        Instance.id == instance_id,
-        Instance.user_id == current_user.id
-    ).first()
+    """Perform an action on an instance (stop, resume, pause, delete)"""
+    instance = await db.get(Instance, instance_id)
     
-    if not instance:
+    if not instance or instance.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instance not found"
         )
     
-    if action.action == "stop":
-        success = await azure_manager.stop_instance(instance.name)
-        if success:
-            instance.status = "stopped"
-            instance.stopped_at = datetime.utcnow()
-            
-            # End current usage record
-            usage_record = db.query(UsageRecord).filter(
-                UsageRecord.instance_id == instance_id,
-                UsageRecord.end_time.is_(None)
-            ).first()
-            if usage_record:
-                usage_record.end_time = datetime.utcnow()
-                usage_record.duration_seconds = (
-                    usage_record.end_time - usage_record.start_time
-                ).total_seconds()
-                usage_record.cost = (
-                    usage_record.duration_seconds / 3600
-                ) * instance.cost_per_hour
-                
-                # Update user credits
-                current_user.credits_remaining -= usage_record.cost
-                instance.total_cost += usage_record.cost
-            
-            db.commit()
-            return {"message": "Instance stopped successfully"}
-    
-    elif action.action == "resume":
-        if instance.status == "paused":
-            # Resume from AutoPause
-            success = await autopause_engine.resume_instance(instance_id)
-        else:
-            # Start stopped instance
-            success = await azure_manager.start_instance(instance.name)
-        
-        if success:
-            instance.status = "running"
-            instance.started_at = datetime.utcnow()
-            
-            # Start new usage record
-            usage_record = UsageRecord(
-                user_id=current_user.id,
-                instance_id=instance.id,
-                start_time=datetime.utcnow()
-            )
-            db.add(usage_record)
-            db.commit()
-            
-            return {"message": "Instance resumed successfully"}
-    
-    elif action.action == "pause":
-        # Manual pause
-        success = await autopause_engine.force_pause(instance_id)
-        if success:
-            instance.status = "paused"
-            instance.paused_at = datetime.utcnow()
-            db.commit()
-            return {"message": "Instance paused successfully"}
-    
-    elif action.action == "delete":
-        # Delete from Azure
-        success = await azure_manager.delete_instance(
-            instance.name,
-            {"vm": instance.azure_resource_id}
-        )
-        
-        if success:
-            # Unregister from AutoPause
-            await autopause_engine.unregister_instance(instance_id)
-            
-            # End usage record
-            usage_record = db.query(UsageRecord).filter(
-                UsageRecord.instance_id == instance_id,
-                UsageRecord.end_time.is_(None)
-            ).first()
-            if usage_record:
-                usage_record.end_time = datetime.utcnow()
-                usage_record.duration_seconds = (
-                    usage_record.end_time - usage_record.start_time
-                ).total_seconds()
-                usage_record.cost = (
-                    usage_record.duration_seconds / 3600
-                ) * instance.cost_per_hour
-                current_user.credits_remaining -= usage_record.cost
-            
-            # Delete from database
-            db.delete(instance)
-            db.commit()
-            
-            return {"message": "Instance deleted successfully"}
-    
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid action: {action.action}"
-        )
+    handler, message = _ACTIONS[action.action]
+    if await handler(instance, db, current_user, azure_manager, autopause_engine):
+        return {"message": message}
     
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         detail=f"Failed to perform action: {action.action}"
     )
 
+@router.post("/bulk-action")
+async def perform_bulk_action(
+    bulk_action: InstanceBulkAction,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    azure_manager: AzureGPUManager = Depends(get_azure_manager),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
+) -> Any:
+    """Stop or delete several instances, calling Azure for all of them concurrently"""
+    result = await db.execute(
+        select(Instance).where(
+            Instance.user_id == current_user.id,
+            Instance.id.in_(bulk_action.instance_ids)
+        )
+    )
+    instances = result.scalars().all()
+    
+    semaphore = asyncio.Semaphore(BULK_ACTION_CONCURRENCY)
+    
+    async def _azure_action(instance: Instance) -> bool:
+        async with semaphore:
+            if bulk_action.action == "stop":
+                return await azure_manager.stop_instance(instance.name)
+            return await azure_manager.delete_instance(
+                instance.name,
+                azure_manager.resource_ids_for(instance.id, instance.name)
+            )
+    
+    outcomes = await asyncio.gather(
+        *(_azure_action(instance) for instance in instances),
+        return_exceptions=True
+    )
+    
+    # Bookkeeping shares one session, so it runs sequentially in one transaction
+    succeeded, failed = [], []
+    for instance, outcome in zip(instances, outcomes):
+        if isinstance(outcome, BaseException) or not outcome:
+            failed.append(instance.id)
+            continue
+        
+        cost = await _close_usage_records(db, instance.id, instance.cost_per_hour)
+        current_user.credits_remaining -= cost
+        
+        if bulk_action.action == "stop":
+            instance.status = "stopped"
+            instance.stopped_at = utc_now()
+            instance.total_cost += cost
+        else:
+            await autopause_engine.unregister_instance(instance.id)
+            await db.delete(instance)
+        
+        succeeded.append(instance.id)
+    
+    if succeeded:
+        await db.commit()
+    
+    found = {instance.id for instance in instances}
+    return {
+        "action": bulk_action.action,
+        "succeeded": succeeded,
+        "failed": failed,
+        "not_found": [i for i in bulk_action.instance_ids if i not in found]
+    }
+
 @router.get("/{instance_id}/savings")
 async def get_instance_savings(
     instance_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
 ) -> Any:
-    """Get AutoPause savings for an instance"""
-    instance = db.query(Instance).filter(
-        Instance.id == instance_id,
-        Instance.user_id == current_user.id
-    ).first()
+    """Get AutoPause savings for an instance (amounts are numeric USD)"""
+    instance = await db.get(Instance, instance_id)
     
-    if not instance:
+    if not instance or instance.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instance not found"
@@ -290,8 +407,8 @@ async def get_instance_savings(
     
     return {
         "instance_id": instance_id,
-        "total_savings": f"${savings['total_savings']:.2f}",
-        "total_paused_hours": f"{savings['total_paused_hours']:.1f}",
+        "total_savings": round(savings['total_savings'], 2),
+        "total_paused_hours": round(savings['total_paused_hours'], 1),
         "pause_count": savings["pause_count"],
         "current_status": savings["current_status"],
         "savings_percentage": (
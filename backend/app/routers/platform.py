@@ -0,0 +1,143 @@
+"""
+Full mode - database, auth, Azure GPU management and AutoPause
+"""
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import orjson
+from ..utils.config import settings
+from ..utils.database import engine, Base
+from ..utils.http import create_http_client
+from ..services.azure_manager import AzureGPUManager
+from ..services.autopause import AutoPauseEngine
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def _init_services(app: FastAPI):
+    """Bring up Azure and AutoPause off the startup critical path"""
+    azure_manager = await asyncio.to_thread(AzureGPUManager)
+    autopause_engine = AutoPauseEngine(azure_manager)
+    
+    # Start AutoPause engine
+    await autopause_engine.start()
+    
+    app.state.azure_manager = azure_manager
+    app.state.autopause_engine = autopause_engine
+    logger.info("Azure and AutoPause services ready")
+
+def _services_done(app: FastAPI, task: asyncio.Task):
+    """Surface a failed background startup instead of leaving /health at "warming" """
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        app.state.services_failed = True
+        logger.error("Azure/AutoPause startup failed", exc_info=exc)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage application lifecycle"""
+    # Startup
+    logger.info("Starting GPU Cloud Platform...")
+    
+    # Services warm up in the background; /health reports "warming" until ready
+    app.state.azure_manager = None
+    app.state.autopause_engine = None
+    app.state.services_failed = False
+    services_task = asyncio.create_task(_init_services(app))
+    services_task.add_done_callback(lambda task: _services_done(app, task))
+    
+    # Create database tables (production runs Alembic before boot instead)
+    if settings.RUN_MIGRATIONS:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    # Shared outbound HTTP client
+    app.state.http = create_http_client()
+    
+    logger.info("GPU Cloud Platform started successfully!")
+    
+    yield
+    
+    # Shutdown
+    logger.info("Shutting down GPU Cloud Platform...")
+    if not services_task.done():
+        services_task.cancel()
+    if app.state.autopause_engine:
+        await app.state.autopause_engine.stop()
+    if app.state.azure_manager:
+        await app.state.azure_manager.close()
+    await app.state.http.aclose()
+    logger.info("Shutdown complete")
+
+ROOT_INFO = {
+    "name": "GPU Cloud Platform",
+    "version": "1.0.0",
+    "status": "operational",
+    "message": "Deploy GPUs in 10 seconds, save 70% with AutoPause"
+}
+ROOT_JSON = orjson.dumps(ROOT_INFO)
+
+def _health_status(app: FastAPI) -> dict:
+    azure_manager = app.state.azure_manager
+    autopause_engine = app.state.autopause_engine
+    pending = "failed" if app.state.services_failed else "warming"
+    return {
+        "status": "degraded" if app.state.services_failed else "healthy",
+        "services": {
+            "database": "connected",
+            "azure": "connected" if azure_manager else pending,
+            "autopause": "running" if autopause_engine and autopause_engine.is_running else pending
+        }
+    }
+
+# Encoded health bodies keyed by (azure ready, autopause running, startup failed); only a few states exist
+_health_json_cache = {}
+
+def _health_json(app: FastAPI) -> bytes:
+    autopause_engine = app.state.autopause_engine
+    key = (
+        app.state.azure_manager is not None,
+        bool(autopause_engine and autopause_engine.is_running),
+        app.state.services_failed
+    )
+    body = _health_json_cache.get(key)
+    if body is None:
+        body = _health_json_cache[key] = orjson.dumps(_health_status(app))
+    return body
+
+# Served by FastPathMiddleware ahead of CORS/compression; the routes below stay for the docs
+FAST_PATHS = {
+    "/": lambda app: ROOT_JSON,
+    "/health": _health_json,
+}
+
+@router.get("/")
+async def root():
+    """Root endpoint"""
+    return ROOT_INFO
+
+@router.get("/health")
+async def health_check(request: Request):
+    """Health check endpoint"""
+    return _health_status(request.app)
+
+@router.get("/api/stats")
+async def platform_stats(request: Request):
+    """Get platform statistics (amounts are numeric USD)"""
+    autopause_engine = request.app.state.autopause_engine
+    if not autopause_engine:
+        raise HTTPException(status_code=503, detail="AutoPause engine not initialized")
+    
+    analytics = autopause_engine.get_analytics()
+    
+    return {
+        "total_instances": analytics["total_instances_monitored"],
+        "currently_paused": analytics["currently_paused"],
+        "total_savings": round(analytics['total_savings_all_time'], 2),
+        "total_pause_hours": round(analytics['total_pause_hours'], 1),
+        "pause_efficiency": round(analytics['pause_efficiency'], 1)
+    }
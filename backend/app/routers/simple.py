@@ -0,0 +1,330 @@
+"""
+Simple mode - Modal-backed deploys with instance state in Redis
+Enabled with MODE=simple; no database, auth or Azure
+"""
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel
+from typing import Optional, List
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime
+import modal
+import orjson
+import redis.asyncio as redis
+from ..utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Initialize Modal
+modal_app = modal.App("gpu-cloud-platform")
+
+# GPU Pricing
+GPU_PRICES = {
+    "T4": 0.99,
+    "A10G": 1.99,
+    "A100": 3.99,
+    "H100": 8.99
+}
+
+# Warm containers kept per GPU type so common deploys skip the cold start
+WARM_CONTAINERS = {
+    "T4": int(os.environ.get("MODAL_WARM_T4", 1)),
+    "A10G": int(os.environ.get("MODAL_WARM_A10G", 1)),
+}
+
+GPU_IMAGE = modal.Image.debian_slim().pip_install(["torch", "jupyterlab"])
+
+def gpu_instance():
+    import socket
+    hostname = socket.gethostname()
+    return {
+        "hostname": hostname,
+        "jupyter_url": f"https://{hostname}.modal.run:8888"
+    }
+
+# One pre-registered Modal function per GPU type, deployed once at startup
+GPU_FUNCS = {
+    gpu: modal_app.function(
+        name=f"gpu-instance-{gpu.lower()}",
+        gpu=gpu,
+        scaledown_window=120,  # Auto-pause after 2 minutes
+        min_containers=WARM_CONTAINERS.get(gpu, 0),
+        image=GPU_IMAGE,
+        serialized=True
+    )(gpu_instance)
+    for gpu in GPU_PRICES
+}
+
+# Shared Redis client (initialized in lifespan)
+redis_client = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Redis pool and deploy the Modal app once instead of on every request"""
+    global redis_client
+    
+    pool = redis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=int(os.environ.get("REDIS_MAX_CONNECTIONS", 50)),
+        decode_responses=True
+    )
+    redis_client = redis.Redis(connection_pool=pool)
+    
+    await asyncio.to_thread(modal_app.deploy)
+    yield
+    
+    await redis_client.aclose()
+    await pool.disconnect()
+
+router = APIRouter()
+
+# Models
+class GPUDeployRequest(BaseModel):
+    name: str
+    gpu_type: str = "T4"  # T4, A10G, A100
+    template: Optional[str] = None
+
+class GPUInstance(BaseModel):
+    id: str
+    name: str
+    gpu_type: str
+    status: str
+    cost_per_hour: float
+    jupyter_url: Optional[str]
+    created_at: str
+    function_call_id: Optional[str] = None
+
+# Instance records live in Redis so every worker sees the same state
+INSTANCE_KEY = "instance:{}"
+INSTANCE_INDEX_KEY = "instances"
+INSTANCE_SEQ_KEY = "instances:seq"
+
+async def load_instance(instance_id: str) -> GPUInstance:
+    data = await redis_client.get(INSTANCE_KEY.format(instance_id))
+    if data is None:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return GPUInstance.model_validate_json(data)
+
+async def save_instance(instance: GPUInstance):
+    await redis_client.set(INSTANCE_KEY.format(instance.id), instance.model_dump_json())
+
+async def update_instance_status(
+    instance_id: str,
+    status: str,
+    expected: Optional[str] = None,
+    **fields
+) -> GPUInstance:
+    """Atomically transition an instance; retries if another worker wrote it first
+    
+    With `expected`, the change only applies while the instance is still in
+    that status; otherwise the current record is returned untouched.
+    """
+    key = INSTANCE_KEY.format(instance_id)
+    
+    async def transition(pipe):
+        data = await pipe.get(key)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Instance not found")
+        instance = GPUInstance.model_validate_json(data)
+        pipe.multi()
+        if expected is not None and instance.status != expected:
+            return instance
+        instance = instance.model_copy(update={"status": status, **fields})
+        pipe.set(key, instance.model_dump_json())
+        return instance
+    
+    return await redis_client.transaction(transition, key, value_from_callable=True)
+
+ROOT_INFO = {
+    "name": "GPU Cloud Platform",
+    "status": "operational",
+    "message": "Deploy GPUs in 10 seconds, save 70% with AutoPause",
+    "endpoints": {
+        "deploy": "/api/deploy",
+        "instances": "/api/instances",
+        "pricing": "/api/pricing"
+    }
+}
+ROOT_JSON = orjson.dumps(ROOT_INFO)
+
+# Served by FastPathMiddleware ahead of CORS/compression
+FAST_PATHS = {
+    "/": lambda app: ROOT_JSON,
+}
+
+@router.get("/")
+async def root():
+    return ROOT_INFO
+
+@router.get("/api/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "modal": "connected",
+        "timestamp": datetime.utcnow()
+    }
+
+@router.post("/api/deploy", response_model=GPUInstance)
+async def deploy_gpu(request: GPUDeployRequest):
+    """Deploy a GPU instance with Modal"""
+    
+    if request.gpu_type not in GPU_FUNCS:
+        raise HTTPException(status_code=400, detail=f"Unsupported GPU type: {request.gpu_type}")
+    
+    # Spawn on the pre-deployed function; returns without waiting for the container
+    call = await asyncio.to_thread(GPU_FUNCS[request.gpu_type].spawn)
+    
+    # Create instance record
+    seq = await redis_client.incr(INSTANCE_SEQ_KEY)
+    instance = GPUInstance(
+        id=f"gpu-{seq:04d}",
+        name=request.name,
+        gpu_type=request.gpu_type,
+        status="provisioning",
+        cost_per_hour=GPU_PRICES.get(request.gpu_type, 0.99),
+        jupyter_url=None,
+        created_at=datetime.utcnow().isoformat(),
+        function_call_id=call.object_id
+    )
+    
+    await save_instance(instance)
+    await redis_client.sadd(INSTANCE_INDEX_KEY, instance.id)
+    
+    return instance
+
+@router.get("/api/instances", response_model=List[GPUInstance])
+async def list_instances():
+    """List all GPU instances"""
+    instance_ids = await redis_client.smembers(INSTANCE_INDEX_KEY)
+    if not instance_ids:
+        return []
+    
+    records = await redis_client.mget([INSTANCE_KEY.format(i) for i in sorted(instance_ids)])
+    return [GPUInstance.model_validate_json(r) for r in records if r is not None]
+
+@router.get("/api/instances/{instance_id}")
+async def get_instance(instance_id: str):
+    """Get instance details"""
+    instance = await load_instance(instance_id)
+    
+    if instance.status == "provisioning" and instance.function_call_id:
+        # Pick up the Jupyter URL once the spawned container has reported in
+        try:
+            call = modal.FunctionCall.from_id(instance.function_call_id)
+            result = await call.get.aio(timeout=0)
+        except TimeoutError:
+            return instance
+        except Exception as e:
+            # The spawned call failed or was cancelled; it will never report in
+            logger.error("Function call for instance %s failed: %s", instance_id, e)
+            return await update_instance_status(instance_id, "error", expected="provisioning")
+        
+        # A concurrent /stop wins over the late "running"
+        instance = await update_instance_status(
+            instance_id, "running", expected="provisioning", jupyter_url=result.get("jupyter_url")
+        )
+    
+    return instance
+
+@router.post("/api/instances/{instance_id}/stop")
+async def stop_instance(instance_id: str):
+    """Stop an instance (it will auto-pause)"""
+    await update_instance_status(instance_id, "stopped")
+    return {"message": f"Instance {instance_id} stopped"}
+
+PRICING = {
+    "gpus": [
+        {"type": "T4", "price_per_hour": 0.99, "memory_gb": 16, "savings_vs_aws": "70%"},
+        {"type": "A10G", "price_per_hour": 1.99, "memory_gb": 24, "savings_vs_aws": "68%"},
+        {"type": "A100", "price_per_hour": 3.99, "memory_gb": 40, "savings_vs_aws": "67%"},
+        {"type": "H100", "price_per_hour": 8.99, "memory_gb": 80, "savings_vs_aws": "65%"}
+    ],
+    "features": [
+        "Auto-pause after 2 minutes idle",
+        "Auto-resume in 15 seconds",
+        "Pay only for active time",
+        "All GPUs include CUDA, PyTorch, TensorFlow"
+    ]
+}
+
+TEMPLATES = [
+    {
+        "id": "llama3",
+        "name": "Llama 3 Chat",
+        "description": "Meta's latest LLM",
+        "gpu_required": "A10G",
+        "one_click_deploy": True
+    },
+    {
+        "id": "stable-diffusion",
+        "name": "Stable Diffusion XL",
+        "description": "Generate images from text",
+        "gpu_required": "A10G",
+        "one_click_deploy": True
+    },
+    {
+        "id": "jupyter",
+        "name": "Jupyter Lab",
+        "description": "Interactive notebooks with GPU",
+        "gpu_required": "T4",
+        "one_click_deploy": True
+    }
+]
+
+def _static_json(payload) -> tuple:
+    """Encode a constant payload once and derive its ETag"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+PRICING_JSON, PRICING_ETAG = _static_json(PRICING)
+TEMPLATES_JSON, TEMPLATES_ETAG = _static_json(TEMPLATES)
+
+def _cached_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/api/pricing")
+async def get_pricing(request: Request):
+    """Get GPU pricing"""
+    return _cached_response(request, PRICING_JSON, PRICING_ETAG)
+
+@router.get("/api/templates")
+async def get_templates(request: Request):
+    """Get available templates"""
+    return _cached_response(request, TEMPLATES_JSON, TEMPLATES_ETAG)
+
+@lru_cache(maxsize=512)
+def _calculate_savings(hours_per_month: int, gpu_type: str) -> bytes:
+    """Savings quote for one (hours, gpu) pair, encoded once"""
+    our_price = GPU_PRICES.get(gpu_type, 0.99)
+    aws_price = our_price * 3.1  # AWS is ~3x more expensive
+    
+    # With auto-pause (70% idle time)
+    our_cost = our_price * hours_per_month * 0.3  # Only pay for 30% active time
+    aws_cost = aws_price * 730  # AWS charges for full month
+    
+    savings = aws_cost - our_cost
+    savings_percent = (savings / aws_cost) * 100
+    
+    return orjson.dumps({
+        "gpu_type": gpu_type,
+        "hours_per_month": hours_per_month,
+        "our_monthly_cost": round(our_cost, 2),
+        "aws_monthly_cost": round(aws_cost, 2),
+        "monthly_savings": round(savings, 2),
+        "savings_percentage": round(savings_percent, 1)
+    })
+
+@router.post("/api/calculate-savings")
+async def calculate_savings(hours_per_month: int = 200, gpu_type: str = "T4"):
+    """Calculate savings vs AWS (amounts are numeric USD)"""
+    return Response(
+        content=_calculate_savings(hours_per_month, gpu_type),
+        media_type="application/json"
+    )
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Any
+from types import MappingProxyType
+import hashlib
+import orjson
 from ..utils.database import get_db
 from ..utils.auth import get_current_active_user
 from ..models.user import User
 from ..models.template import Template
 from ..schemas.instance import InstanceCreate
-import json
+from ..utils.services import get_azure_manager, get_autopause_engine
+from ..services.azure_manager import AzureGPUManager
+from ..services.autopause import AutoPauseEngine
 
 router = APIRouter()
 
@@ -90,12 +96,17 @@ DEFAULT_TEMPLATES = [
     }
 ]
 
+# Shared across requests, so read-only; handlers copy before adding fields
+DEFAULT_TEMPLATES = tuple(MappingProxyType(t) for t in DEFAULT_TEMPLATES)
+TEMPLATES_BY_ID = {t["id"]: t for t in DEFAULT_TEMPLATES}
+
 @router.get("/", response_model=List[dict])
 async def list_templates(
+    request: Request,
     featured_only: bool = False,
     category: str = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """List available templates"""
     
@@ -108,25 +119,38 @@ async def list_templates(
     if category:
         templates = [t for t in templates if t.get("category") == category]
     
-    # Track deploy count from database
-    for template in templates:
-        db_template = db.query(Template).filter(Template.id == template["id"]).first()
-        if db_template:
-            template["deploy_count"] = db_template.deploy_count
-        else:
-            template["deploy_count"] = 0
+    # Track deploy count from database, one query for the whole page
+    counts = {}
+    if templates:
+        result = await db.execute(
+            select(Template.id, Template.deploy_count).where(
+                Template.id.in_([t["id"] for t in templates])
+            )
+        )
+        counts = dict(result.all())
+    
+    # Copy so the module-level templates are never mutated per request
+    body = orjson.dumps([
+        {**template, "deploy_count": counts.get(template["id"]) or 0}
+        for template in templates
+    ])
     
-    return templates
+    # Only deploy counts ever change, so repeat clients mostly get a 304
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=30"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/{template_id}")
 async def get_template(
     template_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Get template details"""
     
-    template = next((t for t in DEFAULT_TEMPLATES if t["id"] == template_id), None)
+    template = TEMPLATES_BY_ID.get(template_id)
     
     if not template:
         raise HTTPException(
@@ -134,18 +158,21 @@ async def get_template(
             detail="Template not found"
         )
     
-    return template
+    return dict(template)
 
 @router.post("/{template_id}/deploy")
 async def deploy_template(
     template_id: str,
+    background_tasks: BackgroundTasks,
     instance_name: str = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    azure_manager: AzureGPUManager = Depends(get_azure_manager),
+    autopause_engine: AutoPauseEngine = Depends(get_autopause_engine)
 ) -> Any:
     """Deploy a template with one click"""
     
-    template = next((t for t in DEFAULT_TEMPLATES if t["id"] == template_id), None)
+    template = TEMPLATES_BY_ID.get(template_id)
     
     if not template:
         raise HTTPException(
@@ -154,7 +181,7 @@ async def deploy_template(
         )
     
     # Create or update template in database
-    db_template = db.query(Template).filter(Template.id == template_id).first()
+    db_template = await db.get(Template, template_id)
     if not db_template:
         db_template = Template(
             id=template_id,
@@ -170,8 +197,8 @@ async def deploy_template(
         )
         db.add(db_template)
     
-    db_template.deploy_count += 1
-    db.commit()
+    db_template.deploy_count = (db_template.deploy_count or 0) + 1
+    await db.commit()
     
     # Create instance from template
     from .instances import deploy_instance
@@ -189,16 +216,18 @@ async def deploy_template(
     # Deploy the instance
     return await deploy_instance(
         instance_data=instance_data,
-        background_tasks=None,
+        background_tasks=background_tasks,
         current_user=current_user,
-        db=db
+        db=db,
+        azure_manager=azure_manager,
+        autopause_engine=autopause_engine
     )
 
 @router.post("/import-huggingface")
 async def import_huggingface_model(
     model_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Import a model from HuggingFace and create a template"""
     
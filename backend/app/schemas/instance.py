@@ -1,10 +1,14 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
+# Keep in sync with AzureGPUManager.GPU_SPECS
+GPUType = Literal["T4", "A10G", "A100"]
+InstanceActionName = Literal["stop", "resume", "pause", "delete"]
+
 class InstanceCreate(BaseModel):
     name: Optional[str] = None
-    gpu_type: str  # T4, A10G, A100
+    gpu_type: GPUType
     template_id: Optional[str] = None
     use_spot: bool = True
     auto_pause_enabled: bool = True
@@ -51,4 +55,8 @@ class InstanceMetrics(BaseModel):
     temperature_celsius: float
 
 class InstanceAction(BaseModel):
-    action: str  # start, stop, pause, resume, delete
\ No newline at end of file
+    action: InstanceActionName
+
+class InstanceBulkAction(BaseModel):
+    instance_ids: List[str]
+    action: Literal["stop", "delete"]
@@ -1,12 +1,61 @@
 import asyncio
+import functools
+import heapq
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 import logging
+from azure.core.exceptions import AzureError
 from ..utils.config import settings
 from .azure_manager import AzureGPUManager
 
 logger = logging.getLogger(__name__)
 
+IDLE_BACKOFF_SAMPLES = 3  # consecutive idle samples before polling backs off
+PAUSE_CONCURRENCY = 16  # Azure deallocations in flight at once
+UTIL_EMA_ALPHA = 0.2  # weight of the newest sample in the utilization average
+REAP_EVERY_TICKS = 60  # loop iterations between sweeps for instances Azure stopped reporting
+
+# Failures an Azure call is expected to hit; anything else is a bug and propagates
+_EXPECTED = (AzureError, asyncio.TimeoutError)
+
+# Savings snapshot for instances AutoPause isn't tracking
+_NO_SAVINGS = MappingProxyType({
+    "total_savings": 0.0,
+    "total_paused_hours": 0.0,
+    "pause_count": 0,
+    "current_status": "active"
+})
+
+@dataclass(slots=True)
+class InstanceMetrics:
+    """AutoPause state for one monitored instance (times are time.monotonic())"""
+    user_id: int
+    sku: Optional[str]
+    hourly_cost: Optional[float]
+    last_active: float
+    last_seen: float
+    poll_interval: float
+    next_poll_at: float = 0.0
+    util_ema: float = 0.0
+    idle_streak: int = 0
+    idle_since: Optional[float] = None
+    last_paused: Optional[float] = None
+    total_paused_time: float = 0.0
+    total_savings: float = 0.0
+    pause_count: int = 0
+
+@functools.lru_cache(maxsize=64)
+def _sku_cost(sku: str) -> float:
+    """Hourly cost for a GPU type or Azure VM size (specs never change at runtime)"""
+    for gpu_type, spec in AzureGPUManager.GPU_SPECS.items():
+        if sku in (gpu_type, spec["azure_size"]):
+            return spec["cost_per_hour"]
+    return 0.0
+
 class AutoPauseEngine:
     """
     AutoPause Engine - The secret sauce that saves 70% on GPU costs
@@ -16,15 +65,39 @@ class AutoPauseEngine:
     def __init__(self, azure_manager: AzureGPUManager):
         self.azure_manager = azure_manager
         self.monitoring_tasks = {}
-        self.instance_metrics = {}
-        self.pause_candidates = {}
+        self.instance_metrics: Dict[str, InstanceMetrics] = {}
+        
+        # Min-heap of (next_poll_at, instance_id); stale entries are skipped on pop
+        self._due: List[tuple] = []
+        
+        # Per-user rollups, kept in step with instance_metrics
+        self.user_instances: Dict[int, set] = defaultdict(set)
+        self.user_savings: Dict[int, float] = defaultdict(float)
+        
+        # Fleet-wide running totals for get_analytics
+        self._agg = {"total_savings": 0.0, "total_pause_time": 0.0, "idle_instances": 0}
+        
+        # Read-only snapshots for the dashboards, rebuilt only after a state change
+        self._version = 0
+        self._analytics_cache: Optional[Mapping] = None
+        self._savings_cache: Dict[str, tuple] = {}  # instance_id -> (version, snapshot)
         
         # Configuration
         self.check_interval = settings.AUTOPAUSE_CHECK_INTERVAL  # seconds
         self.idle_threshold = settings.AUTOPAUSE_IDLE_THRESHOLD  # seconds
         self.gpu_usage_threshold = settings.AUTOPAUSE_GPU_USAGE_THRESHOLD  # percent
+        self.max_poll_interval = max(self.check_interval, self.idle_threshold / 4)
         
         self.is_running = False
+        self._loop_task = None
+        self._pause_sem = asyncio.BoundedSemaphore(PAUSE_CONCURRENCY)
+        
+        # Fixed pool of pause workers fed by the monitoring loop
+        self._pause_queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        
+        # (instance_id, hourly_cost) pauses not yet announced; flushed once per tick
+        self._pending_pause_notifications: List[tuple] = []
     
     async def start(self):
         """Start the AutoPause monitoring engine"""
@@ -34,238 +107,426 @@ class AutoPauseEngine:
         self.is_running = True
         logger.info("AutoPause Engine started - Saving money automatically!")
         
-        # Start the main monitoring loop
-        asyncio.create_task(self._monitoring_loop())
+        # Start the pause workers and the main monitoring loop
+        self._workers = [
+            asyncio.create_task(self._pause_worker())
+            for _ in range(settings.AUTOPAUSE_WORKERS)
+        ]
+        self._loop_task = asyncio.create_task(self._monitoring_loop())
     
     async def stop(self):
         """Stop the AutoPause engine"""
         self.is_running = False
         
-        # Cancel all monitoring tasks
+        # Cancel the loop, the pause workers and any in-flight pauses
+        if self._loop_task:
+            self._loop_task.cancel()
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
         for task in self.monitoring_tasks.values():
             task.cancel()
         
+        await self._flush_pause_notifications()
+        
         logger.info("AutoPause Engine stopped")
     
-    async def register_instance(self, instance_id: str, user_id: int):
-        """Register an instance for AutoPause monitoring"""
-        if instance_id not in self.monitoring_tasks:
-            self.instance_metrics[instance_id] = {
-                "user_id": user_id,
-                "last_active": datetime.utcnow(),
-                "idle_time": 0,
-                "total_paused_time": 0,
-                "total_savings": 0.0,
-                "pause_count": 0,
-                "gpu_history": []
-            }
-            logger.info(f"Instance {instance_id} registered for AutoPause monitoring")
+    async def register_instance(
+        self,
+        instance_id: str,
+        user_id: int,
+        sku: str = None,
+        hourly_cost: float = None
+    ):
+        """Register an instance for AutoPause monitoring
+        
+        The hourly cost is cached here so pause/resume never has to ask Azure
+        for the VM's specs; pass it directly or let it derive from the SKU.
+        """
+        if hourly_cost is None and sku:
+            hourly_cost = _sku_cost(sku)
+        
+        if instance_id not in self.instance_metrics:
+            now = time.monotonic()
+            self.user_instances[user_id].add(instance_id)
+            self.instance_metrics[instance_id] = InstanceMetrics(
+                user_id=user_id,
+                sku=sku,
+                hourly_cost=hourly_cost,
+                last_active=now,
+                last_seen=now,
+                poll_interval=self.check_interval
+            )
+            heapq.heappush(self._due, (0.0, instance_id))
+            self._touch()
+            logger.info("Instance %s registered for AutoPause monitoring", instance_id)
     
     async def unregister_instance(self, instance_id: str):
         """Remove an instance from AutoPause monitoring"""
-        if instance_id in self.monitoring_tasks:
-            self.monitoring_tasks[instance_id].cancel()
-            del self.monitoring_tasks[instance_id]
-        
-        if instance_id in self.instance_metrics:
-            del self.instance_metrics[instance_id]
+        task = self.monitoring_tasks.pop(instance_id, None)
+        if task is not None:
+            task.cancel()
         
-        if instance_id in self.pause_candidates:
-            del self.pause_candidates[instance_id]
+        metrics = self.instance_metrics.pop(instance_id, None)
+        self._savings_cache.pop(instance_id, None)
+        if metrics is not None:
+            self._touch()
+            self._clear_idle(metrics)
+            user_id = metrics.user_id
+            self.user_savings[user_id] -= metrics.total_savings
+            self._agg["total_savings"] -= metrics.total_savings
+            self._agg["total_pause_time"] -= metrics.total_paused_time
+            
+            user_instances = self.user_instances.get(user_id)
+            if user_instances is not None:
+                user_instances.discard(instance_id)
+                if not user_instances:
+                    del self.user_instances[user_id]
+                    self.user_savings.pop(user_id, None)
     
     async def _monitoring_loop(self):
-        """Main monitoring loop that checks all instances"""
+        """Main monitoring loop that checks instances as they come due"""
+        ticks = 0
         while self.is_running:
             try:
-                # Get all active instances to monitor
-                for instance_id, metrics in self.instance_metrics.items():
-                    asyncio.create_task(self._check_instance(instance_id))
+                ticks += 1
+                if ticks % REAP_EVERY_TICKS == 0:
+                    await self._reap_dead_instances()
                 
-                await asyncio.sleep(self.check_interval)
+                # Pop everything due from the schedule; entries whose time no longer
+                # matches the instance's next_poll_at are stale (rescheduled or unregistered)
+                started = time.monotonic()
+                due = {}
+                while self._due and self._due[0][0] <= started:
+                    next_poll_at, instance_id = heapq.heappop(self._due)
+                    metrics = self.instance_metrics.get(instance_id)
+                    if metrics is not None and metrics.next_poll_at == next_poll_at:
+                        due[instance_id] = metrics
+                
+                if due:
+                    check_interval = self.check_interval
+                    to_pause = 0
+                    tick = None
+                    try:
+                        # One batched Azure round trip for every instance that is due;
+                        # steadily idle ones back off (see _evaluate_instance)
+                        results = await self.azure_manager.batch_get_metrics(list(due))
+                        
+                        # One clock read and one settings read per tick, shared by every instance
+                        tick = time.monotonic()
+                        usage_threshold = self.gpu_usage_threshold
+                        idle_threshold = self.idle_threshold
+                        
+                        # Evaluation is synchronous; only instances past the idle threshold
+                        # are handed to the pause workers
+                        for instance_id, instance_status in results.items():
+                            if self._evaluate_instance(
+                                instance_id,
+                                tick,
+                                instance_status["status"],
+                                instance_status["gpu_utilization"],
+                                usage_threshold,
+                                idle_threshold,
+                                check_interval
+                            ):
+                                self._pause_queue.put_nowait((instance_id, instance_status))
+                                to_pause += 1
+                        
+                        self._touch()
+                    finally:
+                        # Popped entries go back even if the fetch or evaluation raised,
+                        # otherwise they would never be polled again
+                        if tick is None:
+                            tick = time.monotonic()
+                        self._reschedule(due, tick, check_interval)
+                    
+                    # Wait for this tick's pauses so their notifications go out together
+                    if to_pause:
+                        await self._pause_queue.join()
+                
+                await self._flush_pause_notifications()
+                
+                # Sleep until the next instance is due, but never past one interval
+                # so newly registered instances are picked up promptly
+                delay = self.check_interval
+                if self._due:
+                    delay = min(delay, max(0.0, self._due[0][0] - time.monotonic()))
+                await asyncio.sleep(delay)
                 
             except Exception as e:
-                logger.error(f"Error in AutoPause monitoring loop: {e}")
+                # The one broad guard: nothing may kill the loop
+                logger.exception("Error in AutoPause monitoring loop: %s", e)
                 await asyncio.sleep(self.check_interval)
     
-    async def _check_instance(self, instance_id: str):
-        """Check a single instance for AutoPause conditions"""
-        try:
-            # Get current instance status
-            instance_status = await self.azure_manager.get_instance_status(instance_id)
-            
-            if not instance_status:
-                return
+    def _reschedule(self, due: Dict[str, InstanceMetrics], tick: float, check_interval: float):
+        """Push polled instances back on the schedule; anything evaluation didn't move comes back next interval"""
+        for instance_id, metrics in due.items():
+            if self.instance_metrics.get(instance_id) is not metrics:
+                continue
+            if metrics.next_poll_at <= tick:
+                metrics.next_poll_at = tick + check_interval
+            heapq.heappush(self._due, (metrics.next_poll_at, instance_id))
+    
+    async def _reap_dead_instances(self):
+        """Unregister instances Azure hasn't reported on within the retention window
+        
+        Catches VMs deleted without going through unregister_instance, so
+        instance_metrics can't grow without bound.
+        """
+        cutoff = time.monotonic() - settings.AUTOPAUSE_MAX_RETENTION
+        dead = [
+            instance_id
+            for instance_id, metrics in self.instance_metrics.items()
+            if metrics.last_seen < cutoff
+        ]
+        for instance_id in dead:
+            await self.unregister_instance(instance_id)
+        
+        if dead:
+            logger.debug("Reaped %d AutoPause instance(s) with no status from Azure", len(dead))
+    
+    async def _pause_worker(self):
+        """Pause queued instances one at a time, for as long as the engine runs"""
+        while True:
+            instance_id, instance_status = await self._pause_queue.get()
+            try:
+                await self._pause_with_sem(instance_id, instance_status)
+            except Exception:
+                logger.exception("Unexpected error pausing instance %s", instance_id)
+            finally:
+                self._pause_queue.task_done()
+    
+    async def _pause_with_sem(self, instance_id: str, instance_status: Dict):
+        async with self._pause_sem:
+            await self._pause_instance(instance_id, instance_status)
+    
+    def _evaluate_instance(
+        self,
+        instance_id: str,
+        tick: float,
+        status: str,
+        gpu_utilization: float,
+        usage_threshold: float,
+        idle_threshold: float,
+        check_interval: float
+    ) -> bool:
+        """Update idle tracking for one instance and say whether it should be paused
+        
+        tick is the time.monotonic() reading shared by the whole tick; the
+        thresholds are bound once per tick by the monitoring loop.
+        """
+        metrics = self.instance_metrics.get(instance_id)
+        if metrics is None:
+            return False
+        
+        # Azure still knows about it, even if it's paused or stopped
+        metrics.last_seen = tick
+        
+        # Only check running instances
+        if status != "running":
+            return False
+        
+        # Running summary instead of a sample history
+        metrics.util_ema += UTIL_EMA_ALPHA * (gpu_utilization - metrics.util_ema)
+        
+        # Check if instance is idle
+        if gpu_utilization < usage_threshold:
+            metrics.idle_streak += 1
             
-            # Only check running instances
-            if instance_status["status"] != "running":
-                return
+            # A run of idle samples won't change the decision; poll less often
+            if metrics.idle_streak >= IDLE_BACKOFF_SAMPLES:
+                metrics.poll_interval = min(metrics.poll_interval * 2, self.max_poll_interval)
+            metrics.next_poll_at = tick + metrics.poll_interval
             
-            # Get current GPU metrics
-            metrics = await self.azure_manager.get_instance_metrics(instance_id)
-            gpu_utilization = metrics.get("gpu_utilization", 0)
+            # Mark as pause candidate
+            if metrics.idle_since is None:
+                metrics.idle_since = tick
+                self._agg["idle_instances"] += 1
+                logger.info("Instance %s marked as pause candidate (GPU: %.1f%%)", instance_id, gpu_utilization)
             
-            # Update metrics history
-            if instance_id in self.instance_metrics:
-                history = self.instance_metrics[instance_id]["gpu_history"]
-                history.append({
-                    "timestamp": datetime.utcnow(),
-                    "gpu_utilization": gpu_utilization
-                })
-                
-                # Keep only last 10 minutes of history
-                cutoff_time = datetime.utcnow() - timedelta(minutes=10)
-                history = [h for h in history if h["timestamp"] > cutoff_time]
-                self.instance_metrics[instance_id]["gpu_history"] = history
-                
-                # Check if instance is idle
-                if gpu_utilization < self.gpu_usage_threshold:
-                    # Mark as pause candidate
-                    if instance_id not in self.pause_candidates:
-                        self.pause_candidates[instance_id] = datetime.utcnow()
-                        logger.info(f"Instance {instance_id} marked as pause candidate (GPU: {gpu_utilization:.1f}%)")
-                    
-                    # Check if idle for long enough
-                    idle_duration = (datetime.utcnow() - self.pause_candidates[instance_id]).total_seconds()
-                    
-                    if idle_duration >= self.idle_threshold:
-                        await self._pause_instance(instance_id, instance_status)
-                
-                else:
-                    # Instance is active, remove from candidates
-                    if instance_id in self.pause_candidates:
-                        del self.pause_candidates[instance_id]
-                    
-                    self.instance_metrics[instance_id]["last_active"] = datetime.utcnow()
-                    self.instance_metrics[instance_id]["idle_time"] = 0
+            # Check if idle for long enough
+            return tick - metrics.idle_since >= idle_threshold
         
-        except Exception as e:
-            logger.error(f"Error checking instance {instance_id}: {e}")
+        # Instance is active, no longer a candidate
+        self._clear_idle(metrics)
+        metrics.last_active = tick
+        metrics.poll_interval = check_interval
+        metrics.next_poll_at = tick + check_interval
+        return False
+    
+    def _touch(self):
+        """Invalidate the analytics and savings snapshots after a state change"""
+        self._version += 1
+        self._analytics_cache = None
+    
+    def _clear_idle(self, metrics: InstanceMetrics):
+        """Reset an instance's idle run and drop it from the candidate count"""
+        if metrics.idle_since is not None:
+            metrics.idle_since = None
+            self._agg["idle_instances"] -= 1
+        metrics.idle_streak = 0
     
     async def _pause_instance(self, instance_id: str, instance_status: Dict):
         """Pause an idle instance to save money"""
         try:
-            logger.info(f"AutoPausing instance {instance_id} to save costs...")
+            logger.info("AutoPausing instance %s to save costs...", instance_id)
             
             # Record pause start time
-            pause_start = datetime.utcnow()
+            pause_start = time.monotonic()
             
             # Pause the instance
             success = await self.azure_manager.pause_instance(instance_id)
             
             if success:
                 # Update metrics
-                if instance_id in self.instance_metrics:
-                    self.instance_metrics[instance_id]["pause_count"] += 1
-                    self.instance_metrics[instance_id]["last_paused"] = pause_start
-                
-                # Remove from pause candidates
-                if instance_id in self.pause_candidates:
-                    del self.pause_candidates[instance_id]
-                
-                # Calculate and log savings
-                hourly_cost = instance_status["specs"]["cost_per_hour"]
-                logger.info(f"Instance {instance_id} paused! Saving ${hourly_cost:.2f}/hour")
+                metrics = self.instance_metrics.get(instance_id)
+                if metrics is not None:
+                    metrics.pause_count += 1
+                    metrics.last_paused = pause_start
+                    self._touch()
+                    
+                    # No longer a pause candidate
+                    self._clear_idle(metrics)
                 
-                # Send notification (would integrate with notification service)
-                await self._notify_pause(instance_id, hourly_cost)
+                # Queue the notification; the monitoring loop sends them in one batch
+                hourly_cost = self._hourly_cost(instance_id, instance_status)
+                self._pending_pause_notifications.append((instance_id, hourly_cost))
             
             else:
-                logger.error(f"Failed to pause instance {instance_id}")
+                logger.error("Failed to pause instance %s", instance_id)
+        
+        except _EXPECTED as e:
+            logger.error("Error pausing instance %s: %s", instance_id, e)
+    
+    def _hourly_cost(self, instance_id: str, instance_status: Dict) -> float:
+        """Cached hourly cost, falling back to the VM size Azure reported"""
+        metrics = self.instance_metrics.get(instance_id)
+        if metrics and metrics.hourly_cost is not None:
+            return metrics.hourly_cost
         
-        except Exception as e:
-            logger.error(f"Error pausing instance {instance_id}: {e}")
+        hourly_cost = _sku_cost(instance_status.get("vm_size", ""))
+        if metrics is not None:
+            metrics.hourly_cost = hourly_cost
+        return hourly_cost
     
     async def resume_instance(self, instance_id: str) -> bool:
         """Resume a paused instance when user returns"""
         try:
-            logger.info(f"Resuming instance {instance_id}...")
+            logger.info("Resuming instance %s...", instance_id)
             
             # Resume the instance
             success = await self.azure_manager.resume_instance(instance_id)
             
-            if success and instance_id in self.instance_metrics:
+            metrics = self.instance_metrics.get(instance_id)
+            if success and metrics:
                 # Calculate pause duration and savings
-                if "last_paused" in self.instance_metrics[instance_id]:
-                    pause_duration = (datetime.utcnow() - self.instance_metrics[instance_id]["last_paused"]).total_seconds()
+                if metrics.last_paused is not None:
+                    pause_duration = time.monotonic() - metrics.last_paused
                     
-                    # Get instance details for cost calculation
-                    instance_status = await self.azure_manager.get_instance_status(instance_id)
-                    if instance_status:
-                        hourly_cost = instance_status["specs"]["cost_per_hour"]
+                    # Only ask Azure for the VM size when the cost wasn't cached at registration
+                    hourly_cost = metrics.hourly_cost
+                    if hourly_cost is None:
+                        instance_status = await self.azure_manager.get_instance_status(instance_id)
+                        if instance_status:
+                            hourly_cost = self._hourly_cost(instance_id, instance_status)
+                    
+                    if hourly_cost is not None:
                         savings = (pause_duration / 3600) * hourly_cost
                         
-                        self.instance_metrics[instance_id]["total_paused_time"] += pause_duration
-                        self.instance_metrics[instance_id]["total_savings"] += savings
+                        metrics.total_paused_time += pause_duration
+                        metrics.total_savings += savings
+                        self.user_savings[metrics.user_id] += savings
+                        self._agg["total_savings"] += savings
+                        self._agg["total_pause_time"] += pause_duration
                         
-                        logger.info(f"Instance {instance_id} resumed! Saved ${savings:.2f} during pause")
+                        logger.info("Instance %s resumed! Saved $%.2f during pause", instance_id, savings)
                 
                 # Reset idle tracking
-                self.instance_metrics[instance_id]["last_active"] = datetime.utcnow()
-                self.instance_metrics[instance_id]["idle_time"] = 0
+                metrics.last_active = time.monotonic()
+                self._clear_idle(metrics)
+                self._touch()
                 
                 return True
             
             return False
         
-        except Exception as e:
-            logger.error(f"Error resuming instance {instance_id}: {e}")
+        except _EXPECTED as e:
+            logger.error("Error resuming instance %s: %s", instance_id, e)
             return False
     
-    def get_instance_savings(self, instance_id: str) -> Dict:
-        """Get AutoPause savings for an instance"""
-        if instance_id not in self.instance_metrics:
-            return {
-                "total_savings": 0.0,
-                "total_paused_hours": 0.0,
-                "pause_count": 0
-            }
-        
-        metrics = self.instance_metrics[instance_id]
-        return {
-            "total_savings": metrics["total_savings"],
-            "total_paused_hours": metrics["total_paused_time"] / 3600,
-            "pause_count": metrics["pause_count"],
-            "last_active": metrics.get("last_active"),
-            "current_status": "paused" if instance_id in self.pause_candidates else "active"
-        }
+    def get_instance_savings(self, instance_id: str) -> Mapping:
+        """Get AutoPause savings for an instance (cached until its state changes)"""
+        metrics = self.instance_metrics.get(instance_id)
+        if metrics is None:
+            return _NO_SAVINGS
+        
+        cached = self._savings_cache.get(instance_id)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        
+        snapshot = MappingProxyType({
+            "total_savings": metrics.total_savings,
+            "total_paused_hours": metrics.total_paused_time / 3600,
+            "pause_count": metrics.pause_count,
+            # Monotonic internally; converted to wall-clock only here
+            "last_active": datetime.utcnow() - timedelta(seconds=time.monotonic() - metrics.last_active),
+            "average_gpu_utilization": metrics.util_ema,
+            "current_status": "paused" if metrics.idle_since is not None else "active"
+        })
+        self._savings_cache[instance_id] = (self._version, snapshot)
+        return snapshot
     
     def get_user_total_savings(self, user_id: int) -> float:
         """Get total AutoPause savings for a user"""
-        total = 0.0
-        for instance_id, metrics in self.instance_metrics.items():
-            if metrics["user_id"] == user_id:
-                total += metrics["total_savings"]
-        return total
+        return self.user_savings.get(user_id, 0.0)
     
     async def force_pause(self, instance_id: str) -> bool:
         """Manually pause an instance (user-triggered)"""
         try:
             instance_status = await self.azure_manager.get_instance_status(instance_id)
             if instance_status and instance_status["status"] == "running":
-                await self._pause_instance(instance_id, instance_status)
+                await self._pause_with_sem(instance_id, instance_status)
                 return True
             return False
-        except Exception as e:
-            logger.error(f"Error force pausing instance {instance_id}: {e}")
+        except _EXPECTED as e:
+            logger.error("Error force pausing instance %s: %s", instance_id, e)
             return False
     
-    async def _notify_pause(self, instance_id: str, savings_per_hour: float):
-        """Send notification about instance pause (placeholder)"""
-        # In production, this would send email/webhook/notification
-        logger.info(f"Notification: Instance {instance_id} paused, saving ${savings_per_hour:.2f}/hour")
+    async def _flush_pause_notifications(self):
+        """Send every pause queued since the last tick as one notification"""
+        if not self._pending_pause_notifications:
+            return
+        
+        events, self._pending_pause_notifications = self._pending_pause_notifications, []
+        await self._notify_pause_batch(events)
     
-    def get_analytics(self) -> Dict:
-        """Get AutoPause analytics for dashboard"""
+    async def _notify_pause_batch(self, events: List[tuple]):
+        """Send notification about instance pauses (placeholder)"""
+        # In production, this would send one email/webhook/notification with the full list
+        if logger.isEnabledFor(logging.INFO):
+            total_per_hour = sum(hourly_cost for _, hourly_cost in events)
+            logger.info(
+                "Notification: %d instance(s) paused, saving $%.2f/hour: %s",
+                len(events), total_per_hour, ", ".join(instance_id for instance_id, _ in events)
+            )
+    
+    def get_analytics(self) -> Mapping:
+        """Get AutoPause analytics for dashboard (cached until the next state change)"""
+        if self._analytics_cache is not None:
+            return self._analytics_cache
+        
         total_instances = len(self.instance_metrics)
-        paused_instances = len([i for i in self.instance_metrics if i in self.pause_candidates])
-        total_savings = sum(m["total_savings"] for m in self.instance_metrics.values())
-        total_pause_time = sum(m["total_paused_time"] for m in self.instance_metrics.values())
+        # Candidates are only ever counted for registered instances
+        paused_instances = self._agg["idle_instances"]
+        total_savings = self._agg["total_savings"]
+        total_pause_time = self._agg["total_pause_time"]
         
-        return {
+        self._analytics_cache = MappingProxyType({
             "total_instances_monitored": total_instances,
             "currently_paused": paused_instances,
             "total_savings_all_time": total_savings,
             "total_pause_hours": total_pause_time / 3600,
             "average_savings_per_instance": total_savings / max(total_instances, 1),
             "pause_efficiency": (paused_instances / max(total_instances, 1)) * 100 if total_instances > 0 else 0
-        }
\ No newline at end of file
+        })
+        return self._analytics_cache
@@ -1,22 +1,35 @@
 """
 GPU Orchestrator - Routes to appropriate provider based on deployment type
 """
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple
+from collections import defaultdict
 from enum import Enum
+import asyncio
 import os
-from .modal_gpu_manager import ModalGPUManager
-from .azure_manager import AzureGPUManager
+import time
 from ..utils.config import settings
 import logging
 
+if TYPE_CHECKING:
+    from .modal_gpu_manager import ModalGPUManager
+
 logger = logging.getLogger(__name__)
 
+MODAL_GPU_TYPES = ("T4", "L4", "A10G", "A100", "H100")
+
+# Provider pricing is static per process; rebuild the catalog at most daily
+GPU_CATALOG_TTL = 86400
+
+PROVIDER_CONCURRENCY = 5  # calls in flight per provider during bulk operations
+
 class DeploymentType(Enum):
     SAAS = "saas"           # Our infrastructure (Modal + DO)
     BYOC = "byoc"           # Customer's cloud (AWS/Azure/GCP)
     ON_PREMISE = "on_premise"  # Customer's data center
     HYBRID = "hybrid"       # Mix of above
 
+_DEPLOYMENT_TYPE_BY_NAME = {m.value: m for m in DeploymentType}
+
 class GPUProvider(Enum):
     MODAL = "modal"
     AZURE = "azure"
@@ -24,20 +37,132 @@ class GPUProvider(Enum):
     RUNPOD = "runpod"
     ON_PREMISE = "on_premise"
 
+_PROVIDER_NAMES = frozenset(m.value for m in GPUProvider)
+
+# Provider preference per deployment type, best first
+_PROVIDER_PREFERENCE = {
+    DeploymentType.SAAS: (GPUProvider.MODAL,),  # Modal for auto-pause
+    DeploymentType.BYOC: (GPUProvider.AZURE, GPUProvider.AWS),  # Customer's cloud
+}
+
+class DeployBatcher:
+    """Coalesces concurrent Modal deployments into one stub.run() per GPU type
+    
+    Requests are collected until max_batch_size arrive or wait_ms passes
+    after the first one, whichever comes first.
+    """
+    
+    __slots__ = ("manager", "max_batch_size", "wait", "_queue", "_task", "_pending", "_closed")
+    
+    def __init__(self, manager: "ModalGPUManager", max_batch_size: int = 8, wait_ms: int = 50):
+        self.manager = manager
+        self.max_batch_size = max_batch_size
+        self.wait = wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: set = set()
+        self._closed = False
+    
+    async def submit(
+        self,
+        name: str,
+        gpu_type: str,
+        docker_image: str = None,
+        memory: int = 32768,
+        cpu: float = 8.0,
+        startup_script: str = None
+    ) -> Dict[str, Any]:
+        """Queue a create_gpu_function call and wait for its batch to deploy"""
+        if self._closed:
+            raise RuntimeError("DeployBatcher is closed")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        self._queue.put_nowait((future, {
+            "name": name,
+            "gpu_type": gpu_type,
+            "docker_image": docker_image,
+            "memory": memory,
+            "cpu": cpu,
+            "startup_script": startup_script
+        }))
+        return await future
+    
+    async def close(self):
+        """Stop batching and fail every deploy still waiting on a batch"""
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("DeployBatcher closed before the deployment ran"))
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            groups = defaultdict(list)
+            for future, spec in batch:
+                groups[spec["gpu_type"]].append((future, spec))
+            
+            await asyncio.gather(*(self._deploy(group) for group in groups.values()))
+    
+    async def _deploy(self, group: List[Tuple[asyncio.Future, Dict[str, Any]]]):
+        try:
+            results = await self.manager.create_gpu_functions_batch([spec for _, spec in group])
+        except Exception as e:
+            logger.error("Batched Modal deployment of %s functions failed: %s", len(group), e)
+            for future, _ in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (future, _), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
 class GPUOrchestrator:
     """
     Universal orchestrator that works with any infrastructure
     This is the magic that makes your platform infrastructure-agnostic
     """
     
+    __slots__ = (
+        "deployment_type", "providers", "_modal_pricing_table", "_deploy_batcher",
+        "_ops", "_preferred_provider", "_gpu_catalog_cache", "_gpu_catalog_ts",
+        "_cheapest_by_gpu"
+    )
+    
     def __init__(self):
         self.deployment_type = self._detect_deployment_type()
+        self._modal_pricing_table = {}
+        self._deploy_batcher = None
         self.providers = self._initialize_providers()
+        self._gpu_catalog_cache = None
+        self._gpu_catalog_ts = 0
+        self._cheapest_by_gpu = {}
         
     def _detect_deployment_type(self) -> DeploymentType:
         """Detect deployment type from environment"""
         deployment = os.getenv("DEPLOYMENT_TYPE", "saas")
-        return DeploymentType(deployment)
+        deployment_type = _DEPLOYMENT_TYPE_BY_NAME.get(deployment)
+        if deployment_type is None:
+            raise ValueError(f"Unknown DEPLOYMENT_TYPE: {deployment}")
+        return deployment_type
     
     def _initialize_providers(self) -> Dict[GPUProvider, Any]:
         """Initialize available providers based on deployment"""
@@ -47,11 +172,18 @@ class GPUOrchestrator:
         if self.deployment_type == DeploymentType.SAAS:
             modal_key = os.getenv("MODAL_API_KEY")
             if modal_key:
-                providers[GPUProvider.MODAL] = ModalGPUManager(modal_key)
+                from .modal_gpu_manager import ModalGPUManager
+                modal_manager = providers[GPUProvider.MODAL] = ModalGPUManager(modal_key)
+                self._modal_pricing_table = {
+                    gpu_type: modal_manager.get_gpu_pricing(gpu_type)
+                    for gpu_type in MODAL_GPU_TYPES
+                }
+                self._deploy_batcher = DeployBatcher(modal_manager)
                 logger.info("Modal provider initialized")
         
         # Initialize Azure if configured (BYOC or Enterprise)
         if settings.AZURE_SUBSCRIPTION_ID:
+            from .azure_manager import AzureGPUManager
             providers[GPUProvider.AZURE] = AzureGPUManager()
             logger.info("Azure provider initialized")
         
@@ -59,8 +191,53 @@ class GPUOrchestrator:
         # providers[GPUProvider.AWS] = AWSManager()
         # providers[GPUProvider.RUNPOD] = RunPodManager()
         
+        self._ops = self._build_ops(providers)
+        self._preferred_provider = next(
+            (p for p in _PROVIDER_PREFERENCE.get(self.deployment_type, ()) if p in providers),
+            next(iter(providers), None)  # Default fallback
+        )
         return providers
     
+    def _build_ops(self, providers: Dict[GPUProvider, Any]) -> Dict[tuple, Any]:
+        """Map (provider value, operation) to the manager coroutine that handles it"""
+        ops = {}
+        
+        if GPUProvider.MODAL in providers:
+            modal_manager = providers[GPUProvider.MODAL]
+            
+            async def modal_resume(instance_id: str) -> bool:
+                # Modal auto-resumes on next invocation
+                return True
+            
+            async def modal_metrics(instance_id: str) -> Dict[str, Any]:
+                status = await modal_manager.get_function_status(instance_id) or {}
+                return {
+                    "gpu_utilization": 0 if status.get("is_idle") else 85,  # Estimate
+                    "status": status.get("status", "unknown"),
+                    "provider": "modal"
+                }
+            
+            ops[("modal", "stop")] = modal_manager.stop_function
+            ops[("modal", "resume")] = modal_resume
+            ops[("modal", "delete")] = modal_manager.delete_function
+            ops[("modal", "metrics")] = modal_metrics
+        
+        if GPUProvider.AZURE in providers:
+            azure_manager = providers[GPUProvider.AZURE]
+            ops[("azure", "stop")] = azure_manager.stop_instance
+            ops[("azure", "resume")] = azure_manager.start_instance
+            ops[("azure", "delete")] = azure_manager.delete_instance
+            ops[("azure", "metrics")] = azure_manager.get_instance_metrics
+        
+        return ops
+    
+    async def close(self):
+        """Stop background work and release provider clients"""
+        if self._deploy_batcher:
+            await self._deploy_batcher.close()
+        if GPUProvider.AZURE in self.providers:
+            await self.providers[GPUProvider.AZURE].close()
+    
     async def deploy_gpu(
         self,
         name: str,
@@ -89,7 +266,8 @@ class GPUOrchestrator:
             if template:
                 instance = await manager.create_template_deployment(template)
             else:
-                instance = await manager.create_gpu_function(
+                # Concurrent deploys share one Modal round-trip
+                instance = await self._deploy_batcher.submit(
                     name=name,
                     gpu_type=gpu_type,
                     **kwargs
@@ -120,106 +298,78 @@ class GPUOrchestrator:
     def _select_best_provider(self, gpu_type: str, user_id: int) -> GPUProvider:
         """
         Intelligent provider selection based on multiple factors
-        """
-        
-        # For SaaS deployment, prefer Modal for auto-pause
-        if self.deployment_type == DeploymentType.SAAS:
-            if GPUProvider.MODAL in self.providers:
-                return GPUProvider.MODAL
         
-        # For BYOC, use customer's cloud
-        elif self.deployment_type == DeploymentType.BYOC:
-            if GPUProvider.AZURE in self.providers:
-                return GPUProvider.AZURE
-            elif GPUProvider.AWS in self.providers:
-                return GPUProvider.AWS
-        
-        # Default fallback
-        if self.providers:
-            return list(self.providers.keys())[0]
-        
-        raise ValueError("No GPU providers available")
+        The choice only depends on deployment type and configured providers,
+        so it is resolved once in _initialize_providers.
+        """
+        if self._preferred_provider is None:
+            raise ValueError("No GPU providers available")
+        return self._preferred_provider
     
     async def stop_instance(self, instance_id: str, provider: str) -> bool:
         """Stop/pause GPU instance"""
-        
-        provider_enum = GPUProvider(provider)
-        if provider_enum not in self.providers:
-            return False
-        
-        manager = self.providers[provider_enum]
-        
-        if provider_enum == GPUProvider.MODAL:
-            return await manager.stop_function(instance_id)
-        elif provider_enum == GPUProvider.AZURE:
-            return await manager.stop_instance(instance_id)
-        
-        return False
+        op = self._ops.get((provider, "stop"))
+        return await op(instance_id) if op else False
     
     async def resume_instance(self, instance_id: str, provider: str) -> bool:
         """Resume paused GPU instance"""
-        
-        provider_enum = GPUProvider(provider)
-        if provider_enum not in self.providers:
-            return False
-        
-        manager = self.providers[provider_enum]
-        
-        if provider_enum == GPUProvider.MODAL:
-            # Modal auto-resumes on next invocation
-            return True
-        elif provider_enum == GPUProvider.AZURE:
-            return await manager.start_instance(instance_id)
-        
-        return False
+        op = self._ops.get((provider, "resume"))
+        return await op(instance_id) if op else False
     
     async def delete_instance(self, instance_id: str, provider: str) -> bool:
         """Delete GPU instance"""
-        
-        provider_enum = GPUProvider(provider)
-        if provider_enum not in self.providers:
-            return False
-        
-        manager = self.providers[provider_enum]
-        
-        if provider_enum == GPUProvider.MODAL:
-            return await manager.delete_function(instance_id)
-        elif provider_enum == GPUProvider.AZURE:
-            return await manager.delete_instance(instance_id, {})
-        
-        return False
+        op = self._ops.get((provider, "delete"))
+        return await op(instance_id) if op else False
     
     async def get_instance_metrics(self, instance_id: str, provider: str) -> Dict[str, Any]:
         """Get instance metrics from provider"""
-        
-        provider_enum = GPUProvider(provider)
-        if provider_enum not in self.providers:
-            return {}
-        
-        manager = self.providers[provider_enum]
-        
-        if provider_enum == GPUProvider.MODAL:
-            status = await manager.get_function_status(instance_id)
-            return {
-                "gpu_utilization": 0 if status.get("is_idle") else 85,  # Estimate
-                "status": status.get("status", "unknown"),
-                "provider": "modal"
-            }
-        elif provider_enum == GPUProvider.AZURE:
-            return await manager.get_instance_metrics(instance_id)
-        
-        return {}
+        op = self._ops.get((provider, "metrics"))
+        return await op(instance_id) if op else {}
+    
+    async def stop_instances(self, ids: List[Tuple[str, str]]) -> List[bool]:
+        """Stop many (instance_id, provider) pairs; results follow input order"""
+        return await self._run_many("stop", ids, False)
+    
+    async def delete_instances(self, ids: List[Tuple[str, str]]) -> List[bool]:
+        """Delete many (instance_id, provider) pairs; results follow input order"""
+        return await self._run_many("delete", ids, False)
+    
+    async def get_instance_metrics_many(self, ids: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Metrics for many (instance_id, provider) pairs; results follow input order"""
+        return await self._run_many("metrics", ids, {})
+    
+    async def _run_many(self, op_name: str, ids: List[Tuple[str, str]], default: Any) -> List[Any]:
+        """Fan an operation out concurrently, capped at PROVIDER_CONCURRENCY per provider"""
+        semaphores = defaultdict(lambda: asyncio.Semaphore(PROVIDER_CONCURRENCY))
+        
+        async def run(instance_id: str, provider: str):
+            op = self._ops.get((provider, op_name))
+            if not op:
+                return default
+            async with semaphores[provider]:
+                try:
+                    return await op(instance_id)
+                except Exception as e:
+                    logger.error("%s failed for %s instance %s: %s", op_name, provider, instance_id, e)
+                    return default
+        
+        return await asyncio.gather(*(run(instance_id, provider) for instance_id, provider in ids))
     
     def get_supported_gpus(self) -> Dict[str, Dict[str, float]]:
         """Get all supported GPU types and pricing across providers"""
         
+        if (
+            self._gpu_catalog_cache is not None
+            and time.monotonic() - self._gpu_catalog_ts < GPU_CATALOG_TTL
+        ):
+            return self._gpu_catalog_cache
+        
         gpus = {}
         
         if GPUProvider.MODAL in self.providers:
-            modal_manager = self.providers[GPUProvider.MODAL]
-            for gpu_type in ["T4", "L4", "A10G", "A100", "H100"]:
+            for gpu_type, price in self._modal_pricing_table.items():
                 gpus[gpu_type] = {
-                    "modal": modal_manager.get_gpu_pricing(gpu_type),
+                    "modal": price,
                     "available": True
                 }
         
@@ -230,8 +380,22 @@ class GPUOrchestrator:
                     gpus[gpu_type] = {}
                 gpus[gpu_type]["azure"] = spec["cost_per_hour"]
         
+        # Cheapest (provider, price) per GPU type, refreshed with the catalog
+        self._cheapest_by_gpu = {}
+        for gpu_type, entry in gpus.items():
+            prices = [(p, v) for p, v in entry.items() if p in _PROVIDER_NAMES]
+            if prices:
+                self._cheapest_by_gpu[gpu_type] = min(prices, key=lambda pv: pv[1])
+        
+        self._gpu_catalog_cache = gpus
+        self._gpu_catalog_ts = time.monotonic()
         return gpus
     
+    def best_provider_for(self, gpu_type: str) -> Optional[Tuple[str, float]]:
+        """Cheapest (provider, hourly price) for a GPU type, or None if unsupported"""
+        self.get_supported_gpus()
+        return self._cheapest_by_gpu.get(gpu_type)
+    
     def calculate_savings_potential(
         self,
         gpu_type: str,
@@ -240,26 +404,43 @@ class GPUOrchestrator:
     ) -> Dict[str, float]:
         """Calculate potential savings with auto-pause"""
         
-        gpus = self.get_supported_gpus()
-        
-        if gpu_type not in gpus:
-            return {}
-        
-        # Get best price (usually Modal with auto-pause)
-        modal_price = gpus[gpu_type].get("modal", 0)
-        aws_price = gpus[gpu_type].get("azure", modal_price * 3)  # AWS is ~3x more
+        rows = self.calculate_savings_potential_bulk([gpu_type], [usage_hours_per_month])
+        return rows[gpu_type][0] if gpu_type in rows else {}
+    
+    def calculate_savings_potential_bulk(
+        self,
+        gpu_types: List[str],
+        usage_hours: List[int]
+    ) -> Dict[str, List[Dict[str, float]]]:
+        """Savings for every GPU type x monthly usage profile
         
-        # Calculate costs
-        always_on_cost = aws_price * 730  # Full month
-        active_hours = usage_hours_per_month
-        our_cost = modal_price * active_hours  # Only pay for active time
+        Rows per GPU type follow the order of usage_hours; unsupported
+        GPU types are left out.
+        """
         
-        savings = always_on_cost - our_cost
-        savings_percent = (savings / always_on_cost) * 100 if always_on_cost > 0 else 0
+        gpus = self.get_supported_gpus()
+        results = {}
         
-        return {
-            "aws_monthly_cost": always_on_cost,
-            "our_monthly_cost": our_cost,
-            "monthly_savings": savings,
-            "savings_percentage": savings_percent
-        }
\ No newline at end of file
+        for gpu_type in gpu_types:
+            if gpu_type not in gpus:
+                continue
+            
+            # Get best price (usually Modal with auto-pause)
+            modal_price = gpus[gpu_type].get("modal", 0)
+            aws_price = gpus[gpu_type].get("azure", modal_price * 3)  # AWS is ~3x more
+            always_on_cost = aws_price * 730  # Full month
+            
+            rows = []
+            for active_hours in usage_hours:
+                our_cost = modal_price * active_hours  # Only pay for active time
+                savings = always_on_cost - our_cost
+                savings_percent = (savings / always_on_cost) * 100 if always_on_cost > 0 else 0
+                rows.append({
+                    "aws_monthly_cost": always_on_cost,
+                    "our_monthly_cost": our_cost,
+                    "monthly_savings": savings,
+                    "savings_percentage": savings_percent
+                })
+            results[gpu_type] = rows
+        
+        return results
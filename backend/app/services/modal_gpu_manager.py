@@ -1,37 +1,159 @@
 """
 Modal GPU Manager - True serverless GPU with auto-pause
 """
-import modal
 import asyncio
-from typing import Dict, Optional, Any, List
-from datetime import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Any, List
+from datetime import datetime, timezone
+from types import MappingProxyType
+import itertools
 import logging
 import os
+import time
+
+if TYPE_CHECKING:
+    import modal
 
 logger = logging.getLogger(__name__)
 
-# Modal configuration
-stub = modal.Stub("gpu-cloud-platform")
+# GPU types matching your pricing
+GPU_TYPES = ("T4", "A10G", "A100", "L4", "H100")
+
+@lru_cache(maxsize=None)
+def _get_modal():
+    """Import the Modal SDK on first use so Azure-only processes never load it"""
+    import modal
+    return modal
+
+@lru_cache(maxsize=None)
+def get_stub() -> "modal.Stub":
+    """Modal configuration, built once with the built-in workloads registered"""
+    stub = _get_modal().Stub("gpu-cloud-platform")
+    _register_builtin_functions(stub)
+    return stub
+
+@lru_cache(maxsize=None)
+def gpu_configs() -> Mapping[str, Any]:
+    """Modal GPU configurations keyed by GPU type"""
+    modal = _get_modal()
+    return MappingProxyType({
+        "T4": modal.gpu.T4(),
+        "A10G": modal.gpu.A10G(),
+        "A100": modal.gpu.A100(),
+        "L4": modal.gpu.L4(),
+        "H100": modal.gpu.H100(),
+    })
+
+def __getattr__(name: str):
+    # Keeps `modal deploy` (which looks up a module-level stub) working
+    if name == "stub":
+        return get_stub()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Modal pricing per hour (approximate)
+_MODAL_PRICING = MappingProxyType({
+    "T4": 0.59,      # $0.59/hour
+    "L4": 0.89,      # $0.89/hour
+    "A10G": 1.10,    # $1.10/hour
+    "A100": 3.09,    # $3.09/hour (40GB)
+    "H100": 8.50     # $8.50/hour
+})
+
+@lru_cache(maxsize=None)
+def _default_image() -> "modal.Image":
+    """Default GPU-ready image, built once"""
+    return (
+        _get_modal().Image.debian_slim()
+        .pip_install([
+            "torch",
+            "transformers",
+            "diffusers",
+            "accelerate",
+            "jupyterlab",
+            "fastapi",
+            "uvicorn"
+        ])
+        .run_commands("apt-get update && apt-get install -y git wget")
+    )
+
+def _dockerfile_image(docker_image: str) -> "modal.Image":
+    """Image for a user-supplied Dockerfile, reused until the file changes"""
+    try:
+        mtime_ns = os.stat(docker_image).st_mtime_ns
+    except OSError:
+        mtime_ns = None  # let Modal report the missing file
+    return _dockerfile_image_at(docker_image, mtime_ns)
+
+@lru_cache(maxsize=32)
+def _dockerfile_image_at(docker_image: str, mtime_ns: Optional[int]) -> "modal.Image":
+    return _get_modal().Image.from_dockerfile(docker_image)
+
+@dataclass(frozen=True, slots=True)
+class TemplateSpec:
+    """A pre-configured deployment for create_template_deployment"""
+    gpu_type: str
+    image: Any
+    startup: str
 
-# GPU configurations matching your pricing
-GPU_CONFIGS = {
-    "T4": modal.gpu.T4(),
-    "A10G": modal.gpu.A10G(),
-    "A100": modal.gpu.A100(),
-    "L4": modal.gpu.L4(),
-    "H100": modal.gpu.H100(),
-}
+@lru_cache(maxsize=None)
+def _templates() -> Mapping[str, TemplateSpec]:
+    """Template catalog with its Modal images built once"""
+    modal = _get_modal()
+    return MappingProxyType({
+        "llama3-chat": TemplateSpec(
+            gpu_type="A10G",
+            image=modal.Image.debian_slim().pip_install(["transformers", "torch", "fastapi"]),
+            startup="python -m transformers.models.llama.modeling_llama"
+        ),
+        "stable-diffusion": TemplateSpec(
+            gpu_type="A10G",
+            image=modal.Image.from_registry("runpod/stable-diffusion:web-ui"),
+            startup="python app.py"
+        ),
+        "jupyter-lab": TemplateSpec(
+            gpu_type="T4",
+            image=modal.Image.debian_slim().pip_install(["jupyterlab", "torch", "numpy"]),
+            startup="jupyter lab --ip=0.0.0.0"
+        )
+    })
+
+def _iso_from_ns(ns: int) -> str:
+    """UTC ISO-8601 timestamp for a time.time_ns() value"""
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+@dataclass(slots=True)
+class ModalFunction:
+    """A deployed Modal function tracked by the manager"""
+    function: Any
+    gpu_type: str
+    created_at_ns: int  # time.time_ns() at deploy
+    status: str = "running"
 
 class ModalGPUManager:
     """Manages GPU instances on Modal with true auto-pause"""
     
+    __slots__ = (
+        "api_key", "_token_id", "_token_secret", "active_functions",
+        "stub", "_name_counter", "workspace"
+    )
+    
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv("MODAL_API_KEY")
+        self._token_id, _, self._token_secret = (self.api_key or "").partition(":")
         if self.api_key:
-            os.environ["MODAL_TOKEN_ID"] = self.api_key.split(":")[0]
-            os.environ["MODAL_TOKEN_SECRET"] = self.api_key.split(":")[1] if ":" in self.api_key else ""
+            # Only touch the environment when the credentials actually change
+            if os.environ.get("MODAL_TOKEN_ID") != self._token_id:
+                os.environ["MODAL_TOKEN_ID"] = self._token_id
+            if os.environ.get("MODAL_TOKEN_SECRET") != self._token_secret:
+                os.environ["MODAL_TOKEN_SECRET"] = self._token_secret
         
-        self.active_functions = {}
+        self.active_functions: Dict[str, ModalFunction] = {}
+        self.stub = get_stub()
+        # Unique, short template deployment names even for same-second deploys
+        self._name_counter = itertools.count(int(time.time() * 1000))
+        # Modal workspace name (read from the environment once)
+        self.workspace = os.getenv("MODAL_WORKSPACE", "sathyat")
         
     async def create_gpu_function(
         self,
@@ -40,42 +162,97 @@ class ModalGPUManager:
         docker_image: str = None,
         memory: int = 32768,  # 32GB default
         cpu: float = 8.0,
-        startup_script: str = None
+        startup_script: str = None,
+        image: "modal.Image" = None
     ) -> Dict[str, Any]:
-        """Create a Modal function with GPU that auto-pauses when idle"""
+        """Create a Modal function with GPU that auto-pauses when idle
         
-        if gpu_type not in GPU_CONFIGS:
-            raise ValueError(f"Invalid GPU type: {gpu_type}. Choose from {list(GPU_CONFIGS.keys())}")
+        A prebuilt image takes precedence over docker_image.
+        """
         
-        # Create Modal image with dependencies
-        if docker_image:
-            image = modal.Image.from_dockerfile(docker_image)
-        else:
-            # Default GPU-ready image
-            image = (
-                modal.Image.debian_slim()
-                .pip_install([
-                    "torch",
-                    "transformers",
-                    "diffusers",
-                    "accelerate",
-                    "jupyterlab",
-                    "fastapi",
-                    "uvicorn"
-                ])
-                .run_commands("apt-get update && apt-get install -y git wget")
+        results = await self.create_gpu_functions_batch([{
+            "name": name,
+            "gpu_type": gpu_type,
+            "docker_image": docker_image,
+            "image": image,
+            "memory": memory,
+            "cpu": cpu,
+            "startup_script": startup_script
+        }])
+        return results[0]
+    
+    async def create_gpu_functions_batch(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deploy several GPU functions in a single stub.run() round-trip
+        
+        Each spec takes the create_gpu_function keyword arguments; results
+        come back in the same order.
+        """
+        
+        for spec in specs:
+            if spec["gpu_type"] not in GPU_TYPES:
+                raise ValueError(f"Invalid GPU type: {spec['gpu_type']}. Choose from {list(GPU_TYPES)}")
+        
+        # stub.run() blocks for the whole Modal round-trip; keep it off the event loop
+        handles = await asyncio.to_thread(self._deploy_batch, specs)
+        return [
+            self._register_function(spec["name"], spec["gpu_type"], handle)
+            for spec, handle in zip(specs, handles)
+        ]
+    
+    def _deploy_batch(self, specs: List[Dict[str, Any]]) -> list:
+        """Define and deploy one batch on its own stub (runs in a worker thread)
+        
+        A fresh stub per batch lets batches run side by side and keeps each
+        stub.run() from redeploying every function defined before it.
+        """
+        stub = _get_modal().Stub("gpu-cloud-platform")
+        handles = [
+            self._define_gpu_function(
+                stub,
+                name=spec["name"],
+                gpu_type=spec["gpu_type"],
+                docker_image=spec.get("docker_image"),
+                image=spec.get("image"),
+                memory=spec.get("memory", 32768),
+                cpu=spec.get("cpu", 8.0)
             )
+            for spec in specs
+        ]
+        
+        # Deploy every function at once
+        with stub.run():
+            return handles
+    
+    def _define_gpu_function(
+        self,
+        stub: "modal.Stub",
+        name: str,
+        gpu_type: str,
+        docker_image: str = None,
+        image: "modal.Image" = None,
+        memory: int = 32768,
+        cpu: float = 8.0
+    ):
+        """Register a GPU function on the given stub (deployed by its next stub.run())"""
+        
+        # Create Modal image with dependencies
+        if image is None:
+            if docker_image:
+                image = _dockerfile_image(docker_image)
+            else:
+                image = _default_image()
         
         # Define the GPU function with auto-scaling
         @stub.function(
             name=name,
             image=image,
-            gpu=GPU_CONFIGS[gpu_type],
+            gpu=gpu_configs()[gpu_type],
             memory=memory,
             cpu=cpu,
             concurrency_limit=1,
             container_idle_timeout=120,  # Auto-pause after 2 minutes idle
             timeout=3600,  # 1 hour max runtime
+            serialized=True,  # closure, not importable by module path
         )
         async def gpu_instance(command: str = None):
             """GPU instance that runs commands or starts services"""
@@ -112,34 +289,35 @@ class ModalGPUManager:
                 "status": "running"
             }
         
-        # Deploy the function
-        with stub.run():
-            # Get function handle
-            function_handle = gpu_instance
-            
-            # Store in active functions
-            self.active_functions[name] = {
-                "function": function_handle,
-                "gpu_type": gpu_type,
-                "created_at": datetime.utcnow(),
-                "status": "running"
-            }
-            
-            # Get the function URL
-            function_url = f"https://{name}--{self.get_workspace()}.modal.run"
-            
-            return {
-                "id": name,
-                "name": name,
-                "gpu_type": gpu_type,
-                "status": "running",
-                "url": function_url,
-                "jupyter_url": f"{function_url}:8888",
-                "api_endpoint": f"{function_url}/api",
-                "created_at": datetime.utcnow().isoformat(),
-                "auto_pause_enabled": True,
-                "idle_timeout": 120
-            }
+        return gpu_instance
+    
+    def _register_function(self, name: str, gpu_type: str, function_handle) -> Dict[str, Any]:
+        """Track a deployed function and describe it"""
+        
+        created_at_ns = time.time_ns()
+        
+        # Store in active functions
+        self.active_functions[name] = ModalFunction(
+            function=function_handle,
+            gpu_type=gpu_type,
+            created_at_ns=created_at_ns
+        )
+        
+        # Get the function URL
+        function_url = f"https://{name}--{self.workspace}.modal.run"
+        
+        return {
+            "id": name,
+            "name": name,
+            "gpu_type": gpu_type,
+            "status": "running",
+            "url": function_url,
+            "jupyter_url": f"{function_url}:8888",
+            "api_endpoint": f"{function_url}/api",
+            "created_at": _iso_from_ns(created_at_ns),
+            "auto_pause_enabled": True,
+            "idle_timeout": 120
+        }
     
     async def invoke_function(self, name: str, command: str = None) -> Dict[str, Any]:
         """Invoke a Modal function (auto-resumes if paused)"""
@@ -147,7 +325,7 @@ class ModalGPUManager:
         if name not in self.active_functions:
             raise ValueError(f"Function {name} not found")
         
-        function = self.active_functions[name]["function"]
+        function = self.active_functions[name].function
         
         # Modal automatically resumes paused functions
         result = await function.remote.aio(command=command)
@@ -161,7 +339,7 @@ class ModalGPUManager:
             return False
         
         # Modal functions auto-pause, we just mark as stopped
-        self.active_functions[name]["status"] = "paused"
+        self.active_functions[name].status = "paused"
         
         return True
     
@@ -190,25 +368,15 @@ class ModalGPUManager:
         
         return {
             "name": name,
-            "gpu_type": function_info["gpu_type"],
-            "status": function_info["status"],
-            "created_at": function_info["created_at"],
-            "is_idle": function_info["status"] == "paused"
+            "gpu_type": function_info.gpu_type,
+            "status": function_info.status,
+            "created_at": _iso_from_ns(function_info.created_at_ns),
+            "is_idle": function_info.status == "paused"
         }
     
     def get_gpu_pricing(self, gpu_type: str) -> float:
         """Get Modal GPU pricing per hour"""
-        
-        # Modal pricing (approximate)
-        pricing = {
-            "T4": 0.59,      # $0.59/hour
-            "L4": 0.89,      # $0.89/hour  
-            "A10G": 1.10,    # $1.10/hour
-            "A100": 3.09,    # $3.09/hour (40GB)
-            "H100": 8.50     # $8.50/hour
-        }
-        
-        return pricing.get(gpu_type, 0)
+        return _MODAL_PRICING.get(gpu_type, 0)
     
     def calculate_cost_savings(self, gpu_type: str, idle_hours: int) -> float:
         """Calculate savings from auto-pause"""
@@ -218,95 +386,79 @@ class ModalGPUManager:
         
         return saved
     
-    def get_workspace(self) -> str:
-        """Get Modal workspace name"""
-        return os.getenv("MODAL_WORKSPACE", "sathyat")
-    
     async def create_template_deployment(self, template: str) -> Dict[str, Any]:
         """Deploy a pre-configured template"""
         
-        templates = {
-            "llama3-chat": {
-                "gpu_type": "A10G",
-                "image": "modal.Image.debian_slim().pip_install(['transformers', 'torch', 'fastapi'])",
-                "startup": "python -m transformers.models.llama.modeling_llama"
-            },
-            "stable-diffusion": {
-                "gpu_type": "A10G",
-                "image": "modal.Image.from_registry('runpod/stable-diffusion:web-ui')",
-                "startup": "python app.py"
-            },
-            "jupyter-lab": {
-                "gpu_type": "T4",
-                "image": "modal.Image.debian_slim().pip_install(['jupyterlab', 'torch', 'numpy'])",
-                "startup": "jupyter lab --ip=0.0.0.0"
-            }
-        }
-        
-        if template not in templates:
+        spec = _templates().get(template)
+        if spec is None:
             raise ValueError(f"Template {template} not found")
         
-        config = templates[template]
-        
         return await self.create_gpu_function(
-            name=f"{template}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
-            gpu_type=config["gpu_type"],
-            startup_script=config.get("startup")
+            name=f"{template}-{next(self._name_counter):x}",
+            gpu_type=spec.gpu_type,
+            image=spec.image,
+            startup_script=spec.startup
         )
 
 
-# Modal function for running GPU workloads
-@stub.function(
-    gpu=modal.gpu.A10G(),
-    image=modal.Image.debian_slim().pip_install(["torch", "transformers"]),
-    concurrency_limit=10,
-    container_idle_timeout=120,  # Auto-pause after 2 minutes
-)
-def run_gpu_workload(task: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    """Run any GPU workload with auto-pause"""
-    
-    import torch
-    import time
-    
-    start_time = time.time()
+
+def _register_builtin_functions(stub: "modal.Stub"):
+    """Attach the built-in GPU workloads to the stub"""
+    modal = _get_modal()
     
-    if task == "inference":
-        # Run model inference
-        from transformers import pipeline
+    # Modal function for running GPU workloads
+    @stub.function(
+        gpu=modal.gpu.A10G(),
+        image=modal.Image.debian_slim().pip_install(["torch", "transformers"]),
+        concurrency_limit=10,
+        container_idle_timeout=120,  # Auto-pause after 2 minutes
+        serialized=True,  # defined inside this function, not at module scope
+    )
+    def run_gpu_workload(task: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run any GPU workload with auto-pause"""
         
-        model = pipeline(params.get("model", "gpt2"))
-        result = model(params.get("input", "Hello world"))
+        import torch
+        import time
         
-        return {
-            "task": task,
-            "result": result,
-            "gpu_used": torch.cuda.get_device_name(0),
-            "execution_time": time.time() - start_time
-        }
-    
-    elif task == "training":
-        # Run training job
-        # Your training code here
-        pass
-    
-    return {"status": "completed", "task": task}
-
-
-# Scheduled function for batch jobs
-@stub.function(
-    schedule=modal.Period(hours=1),  # Run every hour
-    gpu=modal.gpu.T4(),
-)
-def scheduled_batch_job():
-    """Scheduled GPU job that runs periodically"""
-    
-    import torch
-    
-    # Your batch processing code
-    print(f"Running batch job on {torch.cuda.get_device_name(0)}")
-    
-    # Process data
-    # ...
+        start_time = time.time()
+        
+        if task == "inference":
+            # Run model inference
+            from transformers import pipeline
+            
+            model = pipeline(params.get("model", "gpt2"))
+            result = model(params.get("input", "Hello world"))
+            
+            return {
+                "task": task,
+                "result": result,
+                "gpu_used": torch.cuda.get_device_name(0),
+                "execution_time": time.time() - start_time
+            }
+        
+        elif task == "training":
+            # Run training job
+            # Your training code here
+            pass
+        
+        return {"status": "completed", "task": task}
     
-    # Job automatically pauses when done
-    return {"status": "completed"}
\ No newline at end of file
+    # Scheduled function for batch jobs
+    @stub.function(
+        schedule=modal.Period(hours=1),  # Run every hour
+        gpu=modal.gpu.T4(),
+        serialized=True,
+    )
+    def scheduled_batch_job():
+        """Scheduled GPU job that runs periodically"""
+        
+        import torch
+        
+        # Your batch processing code
+        print(f"Running batch job on {torch.cuda.get_device_name(0)}")
+        
+        # Process data
+        # ...
+        
+        # Job automatically pauses when done
+        return {"status": "completed"}
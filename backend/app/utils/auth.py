@@ -1,17 +1,35 @@
+import asyncio
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import TTLCache
 from ..utils.config import settings
 from ..utils.database import get_db
 from ..models.user import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# JWT key material resolved once at import
+_JWT_KEY = settings.JWT_SECRET
+_JWT_ALGORITHM = settings.JWT_ALGORITHM
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+_TOKEN_TTL = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Short-lived cache of verified tokens -> (user id, exp) so back-to-back authed
+# calls skip JWT decoding. The User row itself is always loaded fresh: balances
+# are updated in Python and a stale copy would be written back.
+token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against hashed"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,29 +38,29 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so bcrypt doesn't block the event loop"""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password in a worker thread so bcrypt doesn't block the event loop"""
+    return await asyncio.to_thread(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    expire = datetime.utcnow() + (expires_delta or _TOKEN_TTL)
+    return jwt.encode({**data, "exp": expire}, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 def verify_token(token: str) -> dict:
     """Verify JWT token and return payload"""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
+        return jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
     except JWTError:
         return None
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -51,15 +69,17 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    cached = token_cache.get(token)
+    if cached is not None and cached[1] > time.time():
+        user_id = cached[0]
+    else:
+        payload = verify_token(token)
+        if payload is None or payload.get("sub") is None:
+            raise credentials_exception
+        user_id = int(payload["sub"])
+        token_cache[token] = (user_id, payload.get("exp", 0))
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from cachetools import TTLCache
+
+async def read_through(
+    cache: TTLCache,
+    inflight: Dict[Hashable, "asyncio.Future[Any]"],
+    key: Hashable,
+    fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Read through a TTL cache, collapsing concurrent misses for a key into one fetch
+    
+    Callers that miss while a fetch is running await that same fetch, so a
+    None result or an error reaches every waiter instead of being retried by
+    each in turn. The in-flight entry is dropped by the fetch itself once it
+    settles, never while anyone can still be queued on it.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(_fill(cache, inflight, key, fetch))
+    # A cancelled caller must not cancel the fetch the other waiters share
+    return await asyncio.shield(task)
+
+async def _fill(
+    cache: TTLCache,
+    inflight: Dict[Hashable, "asyncio.Future[Any]"],
+    key: Hashable,
+    fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    try:
+        value = await fetch()
+        if value is not None:
+            cache[key] = value
+        return value
+    finally:
+        inflight.pop(key, None)
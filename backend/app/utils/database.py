@@ -1,15 +1,53 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _async_database_url(url: str) -> str:
+    """Point a plain postgresql:// URL at the asyncpg driver"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        url = "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """Single AsyncEngine shared by every request in this process"""
+    url = _async_database_url(settings.DATABASE_URL)
+    
+    if settings.DB_USE_PGBOUNCER:
+        # PgBouncer multiplexes server connections; prepared statements and
+        # JIT don't survive transaction pooling
+        return create_async_engine(
+            url,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "server_settings": {"jit": "off"}
+            }
+        )
+    
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_POOL_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+
+engine = get_engine()
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+def utc_now():
+    """DB-side UTC timestamp for column defaults (matches naive utcnow() values)"""
+    return func.timezone("utc", func.now())
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
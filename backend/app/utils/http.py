@@ -0,0 +1,13 @@
+import httpx
+from fastapi import Request
+
+def create_http_client() -> httpx.AsyncClient:
+    """Long-lived client for outbound HTTP, created once in lifespan"""
+    return httpx.AsyncClient(
+        timeout=5.0,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+    )
+
+async def get_http(request: Request) -> httpx.AsyncClient:
+    """Dependency returning the shared outbound HTTP client"""
+    return request.app.state.http
@@ -0,0 +1,23 @@
+from fastapi import HTTPException, Request, status
+from ..services.azure_manager import AzureGPUManager
+from ..services.autopause import AutoPauseEngine
+
+def get_azure_manager(request: Request) -> AzureGPUManager:
+    """Azure manager created during lifespan startup"""
+    azure_manager = request.app.state.azure_manager
+    if azure_manager is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Azure manager not initialized"
+        )
+    return azure_manager
+
+def get_autopause_engine(request: Request) -> AutoPauseEngine:
+    """AutoPause engine created during lifespan startup"""
+    autopause_engine = request.app.state.autopause_engine
+    if autopause_engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AutoPause engine not initialized"
+        )
+    return autopause_engine
@@ -0,0 +1,20 @@
+"""
+Gunicorn config for production: one UvicornWorker per CPU core
+Run with: gunicorn app.main:app -c gunicorn_conf.py
+"""
+import multiprocessing
+import os
+from uvicorn.workers import UvicornWorker
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gunicorn_conf.Worker"
+worker_tmp_dir = "/dev/shm"
+
+# Import the app once in the master so workers share it copy-on-write.
+# lifespan still runs per worker; each AutoPause engine only monitors the
+# instances registered through its own worker, so no cross-worker lock is needed.
+preload_app = True
@@ -44,12 +44,14 @@ async def test_modal_deployment():
             cpu=4.0
         )
         
-        print(f"✅ GPU deployed successfully!")
-        print(f"   ID: {instance['id']}")
-        print(f"   URL: {instance['url']}")
-        print(f"   Jupyter: {instance['jupyter_url']}")
-        print(f"   Auto-pause: {instance['auto_pause_enabled']}")
-        print(f"   Cost: ${manager.get_gpu_pricing('T4')}/hour")
+        print(
+            f"✅ GPU deployed successfully!\n"
+            f"   ID: {instance['id']}\n"
+            f"   URL: {instance['url']}\n"
+            f"   Jupyter: {instance['jupyter_url']}\n"
+            f"   Auto-pause: {instance['auto_pause_enabled']}\n"
+            f"   Cost: ${manager.get_gpu_pricing('T4')}/hour"
+        )
         
     except Exception as e:
         print(f"❌ Failed to deploy: {e}")
@@ -66,9 +68,11 @@ async def test_modal_deployment():
     aws_cost = 0.99 * 730  # AWS T4 cost for full month
     our_cost = manager.get_gpu_pricing("T4") * active_hours
     
-    print(f"   AWS Cost (always on): ${aws_cost:.2f}/month")
-    print(f"   Our Cost (auto-pause): ${our_cost:.2f}/month")
-    print(f"   You Save: ${savings:.2f}/month ({(savings/aws_cost)*100:.1f}%)")
+    print(
+        f"   AWS Cost (always on): ${aws_cost:.2f}/month\n"
+        f"   Our Cost (auto-pause): ${our_cost:.2f}/month\n"
+        f"   You Save: ${savings:.2f}/month ({(savings/aws_cost)*100:.1f}%)"
+    )
     
     # Test 3: Stop function (auto-pause)
     print("\n3️⃣ Testing auto-pause...")
@@ -80,24 +84,30 @@ async def test_modal_deployment():
     print("\n4️⃣ Checking instance status...")
     status = await manager.get_function_status("test-gpu-t4")
     if status:
-        print(f"   Status: {status['status']}")
-        print(f"   Is Idle: {status['is_idle']}")
+        print(
+            f"   Status: {status['status']}\n"
+            f"   Is Idle: {status['is_idle']}"
+        )
     
     # Test 5: Template deployment
     print("\n5️⃣ Testing template deployment...")
     try:
         template_instance = await manager.create_template_deployment("jupyter-lab")
-        print(f"✅ Jupyter Lab deployed!")
-        print(f"   URL: {template_instance['jupyter_url']}")
+        print(
+            f"✅ Jupyter Lab deployed!\n"
+            f"   URL: {template_instance['jupyter_url']}"
+        )
     except Exception as e:
         print(f"⚠️  Template deployment skipped: {e}")
     
-    print("\n" + "=" * 50)
-    print("🎉 Modal integration test complete!")
-    print("\nNext steps:")
-    print("1. Check your Modal dashboard: https://modal.com/apps")
-    print("2. Your functions will auto-pause after 2 minutes idle")
-    print("3. They auto-resume in <1 second when accessed")
+    print(
+        "\n" + "=" * 50 + "\n"
+        "🎉 Modal integration test complete!\n"
+        "\nNext steps:\n"
+        "1. Check your Modal dashboard: https://modal.com/apps\n"
+        "2. Your functions will auto-pause after 2 minutes idle\n"
+        "3. They auto-resume in <1 second when accessed"
+    )
     
     return instance
 
@@ -106,5 +116,7 @@ if __name__ == "__main__":
     result = asyncio.run(test_modal_deployment())
     
     if result:
-        print("\n💡 Pro tip: Modal bills per-second and auto-pauses!")
-        print("   This means 70% savings vs always-on GPU providers")
\ No newline at end of file
+        print(
+            "\n💡 Pro tip: Modal bills per-second and auto-pauses!\n"
+            "   This means 70% savings vs always-on GPU providers"
+        )
\ No newline at end of file
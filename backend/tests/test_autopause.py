@@ -0,0 +1,33 @@
+"""AutoPause scheduling"""
+import asyncio
+from app.services.autopause import AutoPauseEngine
+
+class _FailingAzureManager:
+    """Stands in for AzureGPUManager when the batched metrics call blows up"""
+    
+    async def batch_get_metrics(self, vm_names):
+        raise RuntimeError("ARM token request failed")
+
+def test_failed_metrics_fetch_keeps_instances_scheduled():
+    async def run():
+        engine = AutoPauseEngine(_FailingAzureManager())
+        await engine.register_instance("vm-a", user_id=1, hourly_cost=1.0)
+        await engine.register_instance("vm-b", user_id=1, hourly_cost=1.0)
+        
+        engine.is_running = True
+        loop_task = asyncio.create_task(engine._monitoring_loop())
+        await asyncio.sleep(0.05)
+        engine.is_running = False
+        loop_task.cancel()
+        
+        # Both were popped for the failed tick and must be back on the heap
+        # with a live entry one check interval out
+        live = {
+            instance_id
+            for poll_at, instance_id in engine._due
+            if engine.instance_metrics[instance_id].next_poll_at == poll_at
+        }
+        assert live == {"vm-a", "vm-b"}
+        assert all(m.next_poll_at > 0 for m in engine.instance_metrics.values())
+    
+    asyncio.run(run())